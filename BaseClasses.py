@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import collections
+import concurrent.futures
 import functools
 import logging
 import random
 import secrets
+import threading
+import time
 import warnings
 from argparse import Namespace
 from collections import Counter, deque, defaultdict
@@ -102,6 +105,15 @@ class MultiWorld():
     per_slot_randoms: Utils.DeprecateDict[int, random.Random]
     """Deprecated. Please use `self.random` instead."""
 
+    sweep_executor: Optional[concurrent.futures.Executor] = None
+    """If set, sweeps check the reachability of different players' locations concurrently on this executor."""
+
+    cache_spheres: bool = False
+    """Set once placements are final, after which the logical spheres are only computed once and then shared."""
+
+    profiler: Utils.GenerationProfiler = Utils.GenerationProfiler(enabled=False)
+    """Measures the generation steps of this multiworld. Disabled unless generating with profiling."""
+
     class AttributeProxy():
         def __init__(self, rule):
             self.rule = rule
@@ -113,11 +125,28 @@ class MultiWorld():
         region_cache: Dict[int, Dict[str, Region]]
         entrance_cache: Dict[int, Dict[str, Entrance]]
         location_cache: Dict[int, Dict[str, Location]]
+        entrance_rules_versions: Dict[int, int]
+        """Per player, changes whenever one of their Entrances is added, removed or connected, or gets a rule through
+        set_rule, add_rule or Entrance.set_item_dependencies."""
+        entrance_dependencies: Dict[int, Optional[Dict[str, List[Entrance]]]]
+        """Per player, maps item names to the entrances whose access rules depend on them, for the current
+        entrance_rules_versions. None for players that can't use incremental reachability."""
 
         def __init__(self, players: int):
             self.region_cache = {player: {} for player in range(1, players+1)}
             self.entrance_cache = {player: {} for player in range(1, players+1)}
             self.location_cache = {player: {} for player in range(1, players+1)}
+            self.entrance_rules_versions = {player: 0 for player in range(1, players+1)}
+            self.entrance_dependencies = {}
+
+        def update_entrance_rules(self, player: int) -> None:
+            """
+            Invalidates the entrance dependencies of a player and makes CollectionStates recheck all of their blocked
+            entrances. Has to be called after changing the access_rule of an Entrance directly once CollectionStates
+            were updated, which set_rule and add_rule take care of.
+            """
+            self.entrance_rules_versions[player] += 1
+            self.entrance_dependencies.pop(player, None)
 
         def __iadd__(self, other: Iterable[Region]):
             self.extend(other)
@@ -138,6 +167,7 @@ class MultiWorld():
             self.region_cache[new_id] = {}
             self.entrance_cache[new_id] = {}
             self.location_cache[new_id] = {}
+            self.entrance_rules_versions[new_id] = 0
 
         def __iter__(self) -> Iterator[Region]:
             for regions in self.region_cache.values():
@@ -179,6 +209,8 @@ class MultiWorld():
         self.per_slot_randoms = Utils.DeprecateDict("Using per_slot_randoms is now deprecated. Please use the "
                                                     "world's random object instead (usually self.random)", True)
         self.plando_options = PlandoOptions.none
+        self._logical_spheres: Dict[bool, LogicalSpheres] = {}
+        self._logical_spheres_locks = {False: threading.Lock(), True: threading.Lock()}
 
     def get_all_ids(self) -> Tuple[int, ...]:
         return self.player_ids + tuple(self.groups)
@@ -512,6 +544,11 @@ class MultiWorld():
         """Report that access to this Region can result in unlocking this Entrance,
         state.can_reach(Region) in the Entrance's traversal condition, as opposed to pure transition logic."""
         self.indirect_connections.setdefault(region, set()).add(entrance)
+        if entrance is not None and entrance.item_dependencies is None \
+                and entrance.item_dependencies_rule is entrance.access_rule:
+            # a rule from set_rule or add_rule checking the region can only declare its dependencies now
+            from worlds.generic.Rules import set_rule
+            set_rule(entrance, entrance.access_rule)
 
     def get_locations(self, player: Optional[int] = None) -> Iterable[Location]:
         if player is not None:
@@ -581,6 +618,34 @@ class MultiWorld():
 
         return False
 
+    def get_logical_spheres(self, sendable: bool = False) -> LogicalSpheres:
+        """
+        Computes the logical spheres of all filled locations, starting from a fresh state.
+        If `cache_spheres` is set, they are only computed once and shared by all callers.
+
+        :param sendable: only put multiserver sendable locations (location.item.code: int) into spheres, collecting
+                         all other locations as soon as they are reachable
+        """
+        if not self.cache_spheres:
+            return self._compute_logical_spheres(sendable)
+        with self._logical_spheres_locks[sendable]:
+            spheres = self._logical_spheres.get(sendable)
+            if spheres is None:
+                spheres = self._logical_spheres[sendable] = self._compute_logical_spheres(sendable)
+            return spheres
+
+    def _compute_logical_spheres(self, sendable: bool) -> LogicalSpheres:
+        if not sendable:
+            return LogicalSpheres(self, self.get_filled_locations())
+        locations: List[Location] = []
+        events: List[Location] = []
+        for location in self.get_filled_locations():
+            if type(location.item.code) is int and type(location.address) is int:
+                locations.append(location)
+            else:
+                events.append(location)
+        return LogicalSpheres(self, locations, events)
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -589,24 +654,7 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        return iter(self.get_logical_spheres())
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -615,46 +663,10 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int and type(location.address) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        return iter(self.get_logical_spheres(sendable=True))
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
-        if not state:
-            state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -682,6 +694,30 @@ class MultiWorld():
                 return False  # still locations required to be collected
             return True
 
+        def report_missing() -> bool:
+            """Report the relevant locations that could not be reached"""
+            if __debug__:
+                from Fill import FillError
+                raise FillError(
+                    f"Could not access required locations for accessibility check. Missing: {locations}",
+                    multiworld=self,
+                )
+            # ran out of places and did not finish yet, quit
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {locations}")
+            return False
+
+        if not state:
+            # everything reachable from a fresh state is known from the logical spheres, so only check the end result
+            spheres = self.get_logical_spheres()
+            state = spheres.get_state(-1)
+            locations = [location for location in self.get_locations() if location_relevant(location)
+                         and (location in spheres.unreachable if location.item else not location.can_reach(state))]
+            beatable_fulfilled = self.has_beaten_game(state)
+            if all_done():
+                return True
+            return report_missing() if locations else False
+
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
         while locations:
@@ -691,16 +727,7 @@ class MultiWorld():
                     sphere.append(locations.pop(n))
 
             if not sphere:
-                if __debug__:
-                    from Fill import FillError
-                    raise FillError(
-                        f"Could not access required locations for accessibility check. Missing: {locations}",
-                        multiworld=self,
-                    )
-                # ran out of places and did not finish yet, quit
-                logging.warning(f"Could not access required locations for accessibility check."
-                                f" Missing: {locations}")
-                return False
+                return report_missing()
 
             for location in sphere:
                 if location.item:
@@ -715,6 +742,98 @@ class MultiWorld():
         return False
 
 
+class LogicalSpheres:
+    """
+    The logical spheres of a set of filled locations, starting from a fresh state.
+
+    Like sweeps, only locations holding advancement items are collected. The sphere of every other location is then
+    found by bisecting over the states at the start of each sphere, instead of checking it again in every sphere.
+    """
+    progression: List[Set[Location]]
+    """locations holding advancement items, for each sphere"""
+    spheres: List[Set[Location]]
+    """all reachable locations, for each sphere"""
+    unreachable: Set[Location]
+    states: List[CollectionState]
+    """state at the start of each sphere, followed by the state after collecting all reachable locations"""
+
+    def __init__(self, multiworld: MultiWorld, locations: Iterable[Location], events: Iterable[Location] = ()):
+        """
+        :param multiworld: MultiWorld the locations belong to
+        :param locations: filled locations to sort into spheres
+        :param events: filled locations that are collected as soon as they are reachable, without being in any sphere
+        """
+        self._lock = threading.Lock()
+        state = CollectionState(multiworld)
+        events = set(events)
+        remaining: Set[Location] = set()
+        others: List[Location] = []
+        for location in locations:
+            if location.advancement:
+                remaining.add(location)
+            else:
+                others.append(location)
+
+        self.progression = []
+        self.states = []
+        while True:
+            # cull events out
+            done_events: Set[Union[Location, None]] = {None}
+            while done_events:
+                done_events = set()
+                for event in events:
+                    if event.can_reach(state):
+                        state.collect(event.item, True, event)
+                        done_events.add(event)
+                events -= done_events
+
+            self.states.append(state)
+            sphere = {location for location in remaining if location.can_reach(state)}
+            if not sphere:
+                break
+            self.progression.append(sphere)
+            remaining -= sphere
+            state = state.copy()
+            for location in sphere:
+                state.collect(location.item, True, location)
+
+        self.unreachable = remaining
+        self.spheres = [set(sphere) for sphere in self.progression]
+        self.spheres.append(set())
+        for location in others:
+            if not location.can_reach(state):
+                self.unreachable.add(location)
+                continue
+            low, high = 0, len(self.progression)
+            while low < high:
+                middle = (low + high) // 2
+                if location.can_reach(self.states[middle]):
+                    high = middle
+                else:
+                    low = middle + 1
+            self.spheres[low].add(location)
+        if not self.spheres[-1]:
+            self.spheres.pop()
+
+    def __iter__(self) -> Iterator[Set[Location]]:
+        """
+        yields a copy of each sphere
+
+        If there are unreachable locations, the last sphere of reachable locations is followed by an empty set, and
+        then a set of all of the unreachable locations.
+        """
+        for sphere in self.spheres:
+            yield set(sphere)
+        if self.unreachable:
+            yield set()
+            yield set(self.unreachable)
+
+    def get_state(self, sphere: int) -> CollectionState:
+        """Returns a copy of the state at the start of a sphere, -1 for the state after all reachable locations."""
+        with self._lock:
+            return self.states[sphere].copy()
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
@@ -727,20 +846,29 @@ class CollectionState():
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
     stale: Dict[int, bool]
+    stale_connections: Dict[int, Optional[Set[Entrance]]]
+    """Blocked connections to retry on the next update of a player using incremental reachability.
+    None means every blocked connection of that player is retried."""
+    entrance_rules_versions: Dict[int, int]
+    """Per player, the entrance_rules_versions of the multiworld's regions at the last update.
+    If the entrance rules changed since, every blocked connection of that player is retried."""
     allow_partial_entrances: bool
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = Utils.CopyOnAccessDict({player: Counter() for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = Utils.CopyOnAccessDict({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = Utils.CopyOnAccessDict({player: set() for player in parent.get_all_ids()})
         self.advancements = set()
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.stale_connections = {player: None for player in parent.get_all_ids()}
+        self.entrance_rules_versions = {player: parent.regions.entrance_rules_versions[player]
+                                        for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
         for function in self.additional_init_functions:
             function(self, parent)
@@ -752,7 +880,21 @@ class CollectionState():
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        blocked_connections = self.blocked_connections[player]
+        stale_connections = self.stale_connections[player]
+        self.stale_connections[player] = None
+        regions = self.multiworld.regions
+        if self.entrance_rules_versions[player] != regions.entrance_rules_versions[player]:
+            # changed rules can pass without any new item, and the stale connections used outdated dependencies
+            self.entrance_rules_versions[player] = regions.entrance_rules_versions[player]
+            stale_connections = None
+        if stale_connections is None:
+            queue = deque(blocked_connections)
+        else:
+            # only the blocked connections depending on newly collected items can have been unblocked
+            queue = deque(connection for connection in stale_connections if connection in blocked_connections)
+        if player not in regions.entrance_dependencies:
+            regions.entrance_dependencies[player] = self._get_connection_dependencies(player)
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
@@ -815,21 +957,54 @@ class CollectionState():
             # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
             queue.extend(blocked_connections)
 
+    def _get_connection_dependencies(self, player: int) -> Optional[Dict[str, List[Entrance]]]:
+        """
+        Builds the index of which entrances have to be rechecked when an item is collected for this player.
+        Returns None if the player's world uses auto indirect conditions or any of its entrances does not declare
+        its `item_dependencies` for its current rule, in which case every blocked connection is rechecked after each
+        collect.
+        """
+        if not self.multiworld.worlds[player].explicit_indirect_conditions:
+            return None
+        dependencies: Dict[str, List[Entrance]] = {}
+        for entrance in self.multiworld.regions.entrance_cache[player].values():
+            if entrance.item_dependencies is None or entrance.item_dependencies_rule is not entrance.access_rule:
+                if entrance.access_rule is Entrance.access_rule:
+                    # always passable, so it never has to be rechecked
+                    continue
+                return None
+            for item_name in entrance.item_dependencies:
+                dependencies.setdefault(item_name, []).append(entrance)
+        return dependencies
+
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
+        # per-player containers are shared by both states, each state copies a player's container on first access
+        ret.prog_items = self._share_player_data("prog_items")
+        ret.reachable_regions = self._share_player_data("reachable_regions")
+        ret.blocked_connections = self._share_player_data("blocked_connections")
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.stale = {player: True for player in self.stale}
+        ret.stale_connections = {player: None for player in self.stale}
+        ret.entrance_rules_versions = self.entrance_rules_versions.copy()
         ret.allow_partial_entrances = self.allow_partial_entrances
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    def _share_player_data(self, attribute: str) -> Utils.CopyOnAccessDict:
+        player_data = getattr(self, attribute)
+        if not isinstance(player_data, Utils.CopyOnAccessDict):
+            # replaced by a plain dict from outside, which can't be shared in place
+            player_data = Utils.CopyOnAccessDict(dict(player_data))
+            setattr(self, attribute, player_data)
+        return player_data.share()
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -873,27 +1048,27 @@ class CollectionState():
         # under this assumption, an extra sweep iteration is performed that checks every player, to confirm that the
         # sweep is finished.
         checking_if_finished = False
+        sweep_executor = self.multiworld.sweep_executor
         while players_to_check:
             next_advancements_per_player: List[Tuple[int, List[Location]]] = []
             next_players_to_check = set()
 
+            concurrent_results: Optional[Dict[int, Tuple[List[Location], List[Location]]]] = None
+            # The confirmation iteration is always run in a single thread, so that any dependency between players that
+            # was missed while checking them concurrently is found before the sweep finishes.
+            if sweep_executor and not checking_if_finished and len(players_to_check) > 1:
+                concurrent_results = self._split_reachable_concurrently(sweep_executor, advancements_per_player,
+                                                                        players_to_check)
+
             for player, locations in advancements_per_player:
                 if player not in players_to_check:
                     next_advancements_per_player.append((player, locations))
                     continue
 
-                # Accessibility of each location is checked first because a player's region accessibility cache becomes
-                # stale whenever one of their own items is collected into the state.
-                reachable_locations: List[Location] = []
-                unreachable_locations: List[Location] = []
-                for location in locations:
-                    if location.can_reach(self):
-                        # Locations containing items that do not belong to `player` could be collected immediately
-                        # because they won't stale `player`'s region accessibility cache, but, for simplicity, all the
-                        # items at reachable locations are collected in a single loop.
-                        reachable_locations.append(location)
-                    else:
-                        unreachable_locations.append(location)
+                if concurrent_results is None:
+                    reachable_locations, unreachable_locations = self._split_reachable(locations)
+                else:
+                    reachable_locations, unreachable_locations = concurrent_results[player]
                 if unreachable_locations:
                     next_advancements_per_player.append((player, unreachable_locations))
 
@@ -906,7 +1081,10 @@ class CollectionState():
                 # added to `next_players_to_check` would need to be run once for every item that is collected, so it is
                 # more performant to instead discard `player` from `next_players_to_check` once their locations have
                 # been processed.
-                next_players_to_check.discard(player)
+                # When checked concurrently, all players were checked before any item was collected, so they have to be
+                # checked again if they received an item.
+                if concurrent_results is None:
+                    next_players_to_check.discard(player)
 
                 # Collect the items from the reachable locations.
                 for advancement in reachable_locations:
@@ -933,6 +1111,38 @@ class CollectionState():
             if yield_each_sweep:
                 yield
 
+    def _split_reachable(self, locations: List[Location]) -> Tuple[List[Location], List[Location]]:
+        """Splits locations into those that are reachable and those that are not, keeping their order."""
+        # Accessibility of each location is checked first because a player's region accessibility cache becomes
+        # stale whenever one of their own items is collected into the state.
+        reachable_locations: List[Location] = []
+        unreachable_locations: List[Location] = []
+        for location in locations:
+            if location.can_reach(self):
+                # Locations containing items that do not belong to the locations' player could be collected
+                # immediately because they won't stale that player's region accessibility cache, but, for simplicity,
+                # all the items at reachable locations are collected in a single loop.
+                reachable_locations.append(location)
+            else:
+                unreachable_locations.append(location)
+        return reachable_locations, unreachable_locations
+
+    def _split_reachable_concurrently(self, executor: concurrent.futures.Executor,
+                                      advancements_per_player: List[Tuple[int, List[Location]]],
+                                      players_to_check: Set[int]) -> Dict[int, Tuple[List[Location], List[Location]]]:
+        """
+        Runs _split_reachable for each player to check in a separate task. Nothing is collected while the tasks run, so
+        under the assumption that each player's world only logically depends on itself, every task only updates its own
+        player's region cache.
+        """
+        # copy every player's containers out of shared snapshots up front, so no two tasks materialize the same one
+        for player_data in (self.prog_items, self.reachable_regions, self.blocked_connections):
+            if isinstance(player_data, Utils.CopyOnAccessDict):
+                player_data.materialize()
+        futures = {player: executor.submit(self._split_reachable, locations)
+                   for player, locations in advancements_per_player if player in players_to_check}
+        return {player: future.result() for player, future in futures.items()}
+
     @overload
     def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None, *,
                                yield_each_sweep: Literal[True],
@@ -1115,7 +1325,17 @@ class CollectionState():
 
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
-        self.stale[item.player] = True
+        player = item.player
+        dependencies = self.multiworld.regions.entrance_dependencies.get(player)
+        if dependencies is None:
+            self.stale[player] = True
+        else:
+            stale_connections = self.stale_connections[player]
+            if not self.stale[player]:
+                self.stale[player] = True
+                self.stale_connections[player] = stale_connections = set()
+            if stale_connections is not None:
+                stale_connections.update(dependencies.get(item.name, ()))
 
         if changed and not prevent_sweep:
             self.sweep_for_advancements()
@@ -1140,6 +1360,7 @@ class CollectionState():
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
             self.stale[item.player] = True
+            self.stale_connections[item.player] = None
 
     def remove_item(self, item: str, player: int, count: int = 1) -> None:
         """
@@ -1176,6 +1397,13 @@ class EntranceType(IntEnum):
 
 class Entrance:
     access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
+    item_dependencies: Optional[AbstractSet[str]] = None
+    """Names of this player's items whose collection can make access_rule pass, None if unknown.
+    If every Entrance of a world declares this, collecting an item only rechecks the blocked Entrances depending on it.
+    Declared with set_item_dependencies after setting the rule, which set_rule and add_rule do for declarative rules
+    from worlds.generic.Rules."""
+    item_dependencies_rule: Optional[Callable[[CollectionState], bool]] = None
+    """The access_rule item_dependencies were declared for, they are ignored once access_rule is replaced."""
     hide_path: bool = False
     player: int
     name: str
@@ -1192,6 +1420,16 @@ class Entrance:
         self.randomization_group = randomization_group
         self.randomization_type = randomization_type
 
+    def set_item_dependencies(self, item_dependencies: Optional[AbstractSet[str]]) -> None:
+        """Declares the item_dependencies of the current access_rule, and makes CollectionStates recheck this."""
+        self.item_dependencies = item_dependencies
+        self.item_dependencies_rule = self.access_rule
+        self._update_entrance_rules()
+
+    def _update_entrance_rules(self) -> None:
+        if self.parent_region and self.parent_region.multiworld:
+            self.parent_region.multiworld.regions.update_entrance_rules(self.player)
+
     def can_reach(self, state: CollectionState) -> bool:
         assert self.parent_region, f"called can_reach on an Entrance \"{self}\" with no parent_region"
         if self.parent_region.can_reach(state) and self.access_rule(state):
@@ -1204,6 +1442,7 @@ class Entrance:
     def connect(self, region: Region) -> None:
         self.connected_region = region
         region.entrances.append(self)
+        self._update_entrance_rules()
 
     def is_valid_source_transition(self, er_state: "ERPlacementState") -> bool:
         """
@@ -1289,12 +1528,14 @@ class Region:
             entrance: Entrance = self._list[index]
             del self._list[index]
             del(self.region_manager.entrance_cache[entrance.player][entrance.name])
+            self.region_manager.update_entrance_rules(entrance.player)
 
         def insert(self, index: int, value: Entrance) -> None:
             assert value.name not in self.region_manager.entrance_cache[value.player], \
                 f"{value.name} already exists in the entrance cache."
             self._list.insert(index, value)
             self.region_manager.entrance_cache[value.player][value.name] = value
+            self.region_manager.update_entrance_rules(value.player)
 
     _locations: LocationRegister[Location]
     _exits: EntranceRegister[Entrance]
@@ -1689,63 +1930,92 @@ class Spoiler:
             self.entrances[(entrance, direction, player)] = \
                 {"player": player, "entrance": entrance, "exit": exit_, "direction": direction}
 
-    def create_playthrough(self, create_paths: bool = True) -> None:
-        """Destructive to the multiworld while it is run, damage gets repaired afterwards."""
+    def create_playthrough(self, create_paths: bool = True, time_limit: float = 0) -> None:
+        """
+        Destructive to the multiworld while it is run, damage gets repaired afterwards.
+
+        :param create_paths: also create the paths to the required locations
+        :param time_limit: seconds after which no more locations are removed from the playthrough, 0 for no limit
+        """
         from itertools import chain
-        # get locations containing progress items
         multiworld = self.multiworld
-        prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
-        collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
+        # build up spheres of collection radius.
+        # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
         logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-
-            sphere_candidates -= sphere
-            collection_spheres.append(sphere)
-            state_cache.append(state.copy())
-
-            logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
-                    raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
-                                       f'Something went terribly wrong here.')
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+        spheres = multiworld.get_logical_spheres()
+        collection_spheres: List[Set[Location]] = [set(sphere) for sphere in spheres.progression]
+        unreachables = {location for location in spheres.unreachable if location.item.advancement}
+        logging.debug('Calculated %i spheres, containing %i progress items.', len(collection_spheres),
+                      sum(len(sphere) for sphere in collection_spheres))
+        if unreachables:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           unreachables])
+            if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in unreachables]):
+                raise RuntimeError(f'Not all progression items reachable ({unreachables}). '
+                                   f'Something went terribly wrong here.')
+            else:
+                self.unreachables = unreachables
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
         required_locations = {location for sphere in collection_spheres for location in sphere}
-        for num, sphere in reversed(tuple(enumerate(collection_spheres))):
-            to_delete: Set[Location] = set()
-            for location in sphere:
-                # we remove the location from required_locations to sweep from, and check if the game is still beatable
-                logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
-                              location.item.player)
-                required_locations.remove(location)
-                if multiworld.can_beat_game(state_cache[num], required_locations):
-                    to_delete.add(location)
+        location_count = len(required_locations)
+        checked_count = 0
+        cull_start = last_report = time.perf_counter()
+
+        def remove_if_not_required(sphere_state: CollectionState, locations: Collection[Location]) -> bool:
+            """
+            Removes the locations from required_locations if the game can still be beaten without them.
+            As the game is beaten without ever collecting them, this also removes all later required locations that
+            had not been collected yet by the time the game was beaten.
+            """
+            # we remove the locations from required_locations to sweep from, and check if the game is still beatable
+            required_locations.difference_update(locations)
+            state = sphere_state.copy()
+            if not multiworld.has_beaten_game(state):
+                for _ in state.sweep_for_advancements(required_locations,
+                                                      yield_each_sweep=True,
+                                                      checked_locations=state.locations_checked):
+                    if multiworld.has_beaten_game(state):
+                        break
                 else:
-                    # still required, got to keep it around
-                    required_locations.add(location)
+                    # still required, got to keep them around
+                    required_locations.update(locations)
+                    return False
+            # earlier spheres are collected into sphere_state, so they are in locations_checked as well
+            required_locations.intersection_update(state.locations_checked)
+            return True
 
+        # whether the previous sphere did not contain any required locations
+        previous_sphere_removed = True
+        for num, sphere in reversed(tuple(enumerate(collection_spheres))):
+            sphere_state = spheres.get_state(num)
+            # if nothing was required in the previous sphere, try to remove this whole sphere at once as well
+            if previous_sphere_removed and len(sphere) > 1 \
+                    and not (time_limit and time.perf_counter() - cull_start > time_limit) \
+                    and remove_if_not_required(sphere_state, sphere):
+                checked_count += len(sphere)
+            else:
+                for location in sorted(sphere):
+                    now = time.perf_counter()
+                    if time_limit and now - cull_start > time_limit:
+                        break
+                    if now - last_report > 10:
+                        last_report = now
+                        logging.info(f"Checked {checked_count} of {location_count} playthrough items.")
+                    checked_count += 1
+                    if location not in required_locations:
+                        continue
+                    logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
+                                  location.item.player)
+                    remove_if_not_required(sphere_state, (location,))
             # cull entries in spheres for spoiler walkthrough at end
-            sphere -= to_delete
+            sphere &= required_locations
+            previous_sphere_removed = not sphere
+        if checked_count < location_count:
+            logging.warning(f"Playthrough time limit of {time_limit} seconds reached, keeping "
+                            f"{location_count - checked_count} items that may not be required to beat the game.")
 
         # second phase, sphere 0
         removed_precollected: List[Item] = []
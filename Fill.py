@@ -1,6 +1,10 @@
 import collections
+import functools
+import heapq
+import inspect
 import itertools
 import logging
+import time
 import typing
 from collections import Counter, deque
 
@@ -24,6 +28,79 @@ def _log_fill_progress(name: str, placed: int, total_items: int) -> None:
     logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed.")
 
 
+_FillStep = typing.TypeVar("_FillStep", bound=typing.Callable[..., None])
+
+
+def _profile_fill_step(fill_step: _FillStep) -> _FillStep:
+    """Measures each call of fill_step with the multiworld's profiler, named after the step's name argument."""
+    signature = inspect.signature(fill_step)
+
+    @functools.wraps(fill_step)
+    def profiled_fill_step(multiworld: MultiWorld, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if not multiworld.profiler.enabled:
+            return fill_step(multiworld, *args, **kwargs)
+        arguments = signature.bind(multiworld, *args, **kwargs).arguments
+        name = arguments.get("name", signature.parameters["name"].default)
+        with multiworld.profiler.measure(f"{fill_step.__name__} {name}", "fill"):
+            return fill_step(multiworld, *args, **kwargs)
+
+    return typing.cast(_FillStep, profiled_fill_step)
+
+
+class LocationIndex:
+    """
+    Groups the locations to fill by the parts of Location.can_fill that don't depend on the state: player, progress
+    type, item_rule and always_allow. Finding a location for an item evaluates each group's item_rule once and skips the
+    groups that can't hold the item, while still trying the remaining locations in their original order.
+    """
+    locations: typing.List[Location]
+    order: typing.Dict[Location, int]
+    groups: typing.Dict[typing.Tuple[typing.Any, ...], typing.List[Location]]
+
+    def __init__(self, locations: typing.List[Location]) -> None:
+        self.locations = locations
+        self.order = {location: i for i, location in enumerate(locations)}
+        self.groups = {}
+        for location in locations:
+            self.groups.setdefault(self._group_key(location), []).append(location)
+
+    @staticmethod
+    def _group_key(location: Location) -> typing.Tuple[typing.Any, ...]:
+        return location.player, location.progress_type, location.item_rule, location.always_allow
+
+    @property
+    def effective(self) -> bool:
+        """Whether locations share groups enough for the index to be faster than checking each location."""
+        return len(self.groups) * 4 <= len(self.locations)
+
+    def candidates(self, item: Item, single_player_placement: bool) -> typing.Iterable[Location]:
+        """Yields the locations that may be able to hold item, in their original order."""
+        candidate_groups: typing.List[typing.List[Location]] = []
+        for (player, progress_type, item_rule, always_allow), group in self.groups.items():
+            if not group or single_player_placement and player != item.player:
+                continue
+            # a custom always_allow depends on the state, so the group has to be checked location by location
+            if always_allow is Location.always_allow:
+                if progress_type == LocationProgressType.EXCLUDED and (item.advancement or item.useful):
+                    continue
+                if not item_rule(item):
+                    continue
+            candidate_groups.append(group)
+        if len(candidate_groups) == 1:
+            return candidate_groups[0]
+        return heapq.merge(*candidate_groups, key=self.order.__getitem__)
+
+    def pop_fillable(self, state: CollectionState, item: Item, check_access: bool,
+                     single_player_placement: bool) -> typing.Optional[Location]:
+        """Removes and returns the first location that can be filled with item, if any."""
+        for location in self.candidates(item, single_player_placement):
+            if location.can_fill(state, item, check_access):
+                self.groups[self._group_key(location)].remove(location)
+                self.locations.remove(location)
+                return location
+        return None
+
+
 def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item] = tuple(),
                     locations: typing.Optional[typing.List[Location]] = None) -> CollectionState:
     new_state = base_state.copy()
@@ -33,6 +110,7 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+@_profile_fill_step
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -59,6 +137,17 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
 
+    location_index: typing.Optional[LocationIndex] = LocationIndex(locations)
+    if not location_index.effective:
+        location_index = None
+
+    # State that has collected everything still in `item_pool` and `unplaced_items`, but has not swept. Items leaving
+    # or returning to the pool are removed from or collected into it, so each iteration only has to copy and sweep it
+    # instead of collecting the entire pool again.
+    pool_state = base_state.copy()
+    for item in item_pool:
+        pool_state.collect(item, True)
+
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
@@ -80,10 +169,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             for p, pool_item in enumerate(reversed(item_pool), start=1):
                 if pool_item is item:
                     del item_pool[-p]
+                    pool_state.remove(item)
                     break
 
         maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
+            pool_state, (), multiworld.get_filled_locations(item.player)
             if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
@@ -92,6 +182,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             # if we have run out of locations to fill,break out of this loop
             if not locations:
                 unplaced_items += items_to_place
+                for item in items_to_place:
+                    pool_state.collect(item, True)
                 break
             item_to_place = items_to_place.pop(0)
 
@@ -105,15 +197,19 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
-                    break
-
+            if location_index:
+                spot_to_fill = location_index.pop_fillable(maximum_exploration_state, item_to_place,
+                                                           perform_access_check, single_player_placement)
             else:
+                for i, location in enumerate(locations):
+                    if (not single_player_placement or location.player == item_to_place.player) \
+                            and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
+                        # popping by index is faster than removing by content,
+                        spot_to_fill = locations.pop(i)
+                        # skipping a scan for the element
+                        break
+
+            if spot_to_fill is None:
                 # we filled all reachable spots.
                 if swap:
                     # Keep a cache of previous safe swap states that might be usable to sweep from to produce the next
@@ -180,6 +276,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                             reachable_items[placed_item.player].appendleft(
                                 placed_item)
                             item_pool.append(placed_item)
+                            pool_state.collect(placed_item, True)
 
                             # cleanup at the end to hopefully get better errors
                             cleanup_required = True
@@ -193,9 +290,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     if spot_to_fill is None:
                         # Can't place this item, move on to the next
                         unplaced_items.append(item_to_place)
+                        pool_state.collect(item_to_place, True)
                         continue
                 else:
                     unplaced_items.append(item_to_place)
+                    pool_state.collect(item_to_place, True)
                     continue
             multiworld.push_item(spot_to_fill, item_to_place, False)
             spot_to_fill.locked = lock
@@ -254,6 +353,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     item_pool.extend(unplaced_items)
 
 
+@_profile_fill_step
 def remaining_fill(multiworld: MultiWorld,
                    locations: typing.List[Location],
                    itempool: typing.List[Item],
@@ -768,6 +868,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         }
         sphere_num: int = 1
         moved_item_count: int = 0
+        balancing_start = time.perf_counter()
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
@@ -781,6 +882,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             return
 
         while True:
+            sphere_start = time.perf_counter()
+            tested_item_count = 0
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
@@ -855,25 +958,17 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
-                        while items_to_test:
-                            testing = items_to_test.pop()
-                            reducing_state = state.copy()
-                            for location in itertools.chain((
-                                    l for l in items_to_replace
-                                    if l.item.player == player
-                            ), items_to_test):
-                                reducing_state.collect(location.item, True, location)
-
-                            reducing_state.sweep_for_advancements(locations=locations_to_test)
+                        tested_item_count += len(items_to_test)
 
+                        def needs_replacement(reducing_state: CollectionState) -> bool:
                             if multiworld.has_beaten_game(balancing_state):
-                                if not multiworld.has_beaten_game(reducing_state):
-                                    items_to_replace.append(testing)
-                            else:
-                                reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
-                                p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
-                                if p < threshold_percentages[player]:
-                                    items_to_replace.append(testing)
+                                return not multiworld.has_beaten_game(reducing_state)
+                            reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
+                            p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
+                            return p < threshold_percentages[player]
+
+                        items_to_replace += find_items_to_replace(state, items_to_test, locations_to_test,
+                                                                  needs_replacement)
 
                     old_moved_item_count = moved_item_count
 
@@ -913,6 +1008,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 if location.advancement:
                     state.collect(location.item, True, location)
             checked_locations |= sphere_locations
+            logging.debug(f"Sphere {sphere_num - 1} took {time.perf_counter() - sphere_start:.2f} seconds, "
+                          f"testing {tested_item_count} candidate items.")
 
             if multiworld.has_beaten_game(state):
                 break
@@ -920,6 +1017,51 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 logging.warning("Progression Balancing ran out of paths.")
                 break
 
+        logging.info(f"Progression balancing moved {moved_item_count} items in {sphere_num - 1} spheres, "
+                     f"taking {time.perf_counter() - balancing_start:.2f} seconds.")
+
+
+def find_items_to_replace(state: CollectionState, items_to_test: typing.List[Location],
+                          locations_to_test: typing.Set[Location],
+                          needs_replacement: typing.Callable[[CollectionState], bool]) -> typing.List[Location]:
+    """
+    Tests the locations of candidate items for progression balancing, from last to first.
+    Each test sweeps locations_to_test from state with the candidates still to test and the ones already chosen,
+    and the tested candidate gets chosen if needs_replacement is True for the resulting state.
+    needs_replacement has to stay False once it is False for a state, when more items are collected into it.
+    """
+    items_to_replace: typing.List[Location] = []
+    # Collect all candidates once, then take out the tested item and put it back only if it gets chosen,
+    # instead of collecting all the others again for every test.
+    candidates_state = state.copy()
+    for location in items_to_test:
+        candidates_state.collect(location.item, True, location)
+    items_to_test = items_to_test.copy()
+    while items_to_test:
+        testing = items_to_test.pop()
+        candidates_state.remove(testing.item)
+        candidates_state.locations_checked.discard(testing)
+        # removing resets the player's reachable regions. The ones of state are reachable with fewer items,
+        # so continue from them instead of searching from the origin region in every test.
+        player = testing.item.player
+        candidates_state.reachable_regions[player] = state.reachable_regions[player].copy()
+        candidates_state.blocked_connections[player] = state.blocked_connections[player].copy()
+        candidates_state.stale[player] = True
+        candidates_state.stale_connections[player] = None
+        reducing_state = candidates_state.copy()
+        # collecting more items can't make a replacement needed again, so stop sweeping once it isn't
+        replace: typing.Optional[bool] = None
+        for _ in reducing_state.sweep_for_advancements(locations=locations_to_test, yield_each_sweep=True):
+            replace = needs_replacement(reducing_state)
+            if not replace:
+                break
+        if replace is None:
+            replace = needs_replacement(reducing_state)
+        if replace:
+            items_to_replace.append(testing)
+            candidates_state.collect(testing.item, True, testing)
+    return items_to_replace
+
 
 def swap_location_item(location_1: Location, location_2: Location, check_locked: bool = True) -> None:
     """Swaps Items of locations. Does NOT swap flags like shop_slot or locked, but does swap event"""
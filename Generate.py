@@ -51,12 +51,17 @@ def mystery_argparse(argv: list[str] | None = None):
                         help="List of options that can be set manually. Can be combined, for example \"bosses, items\"")
     parser.add_argument("--skip_prog_balancing", action="store_true",
                         help="Skip progression balancing step during generation.")
+    parser.add_argument("--sweep_threads", default=defaults.sweep_threads, type=lambda value: max(int(value), 1),
+                        help="Threads to sweep different players' locations with. Requires free-threaded Python.")
     parser.add_argument("--skip_output", action="store_true",
                         help="Skips generation assertion and output stages and skips multidata and spoiler output. "
                              "Intended for debugging and testing purposes.")
     parser.add_argument("--spoiler_only", action="store_true",
                         help="Skips generation assertion and multidata, outputting only a spoiler log. "
                              "Intended for debugging and testing purposes.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Writes the wall time, CPU time and peak memory of each generation step and world, "
+                             "as a trace file next to the output.")
     args = parser.parse_args(argv)
 
     if args.skip_output and args.spoiler_only:
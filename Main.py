@@ -3,19 +3,21 @@ from collections.abc import Mapping
 import concurrent.futures
 import logging
 import os
+import sys
 import tempfile
 import time
 from typing import Any
+import weakref
 import zipfile
 import zlib
 
 import worlds
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
+from BaseClasses import CollectionState, Entrance, Item, Location, LocationProgressType, MultiWorld, Region
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, flood_items, \
     parse_planned_blocks, distribute_planned_blocks, resolve_early_locations_for_planned
 from NetUtils import convert_to_base_types
 from Options import StartInventoryPool
-from Utils import __version__, output_path, restricted_dumps, version_tuple
+from Utils import GenerationProfiler, __version__, output_path, restricted_dumps, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
 from worlds.generic.Rules import exclusion_rules, locality_rules
@@ -51,6 +53,21 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     multiworld.state = CollectionState(multiworld)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
+    sweep_threads = getattr(args, "sweep_threads", 1)
+    if sweep_threads > 1:
+        if getattr(sys, "_is_gil_enabled", lambda: True)():
+            logger.warning(f"Ignoring sweep_threads {sweep_threads}, as it requires a free-threaded Python build.")
+        else:
+            multiworld.sweep_executor = concurrent.futures.ThreadPoolExecutor(sweep_threads, "Sweep")
+            weakref.finalize(multiworld, multiworld.sweep_executor.shutdown, False)
+
+    if getattr(args, "profile", False):
+        multiworld.profiler = GenerationProfiler()
+        for owner, method_name in ((CollectionState, "sweep_for_advancements"), (Region, "can_reach"),
+                                   (Entrance, "can_reach"), (Location, "can_reach")):
+            multiworld.profiler.count_calls(owner, method_name)
+        weakref.finalize(multiworld, multiworld.profiler.close)
+
     logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
     longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
 
@@ -195,22 +212,27 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
     logger.info(f'Filling the multiworld with {len(multiworld.itempool)} items.')
 
-    if multiworld.algorithm == 'flood':
-        flood_items(multiworld)  # different algo, biased towards early game progress items
-    elif multiworld.algorithm == 'balanced':
-        distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
+    with multiworld.profiler.measure("fill"):
+        if multiworld.algorithm == 'flood':
+            flood_items(multiworld)  # different algo, biased towards early game progress items
+        elif multiworld.algorithm == 'balanced':
+            distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
 
     AutoWorld.call_all(multiworld, 'post_fill')
 
     if multiworld.players > 1 and not args.skip_prog_balancing:
-        balance_multiworld_progression(multiworld)
+        with multiworld.profiler.measure("balance_multiworld_progression"):
+            balance_multiworld_progression(multiworld)
     else:
         logger.info("Progression balancing skipped.")
 
     # we're about to output using multithreading, so we're removing the global random state to prevent accidental use
     multiworld.random.passthrough = False
+    # placements are final, so the logical spheres only need to be computed once for all output
+    multiworld.cache_spheres = True
 
     if args.skip_output:
+        write_profile(multiworld)
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
@@ -220,14 +242,17 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     if args.spoiler_only:
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
-            multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
+            with multiworld.profiler.measure("create_playthrough"):
+                multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2,
+                                                       time_limit=get_settings().generator.playthrough_time_limit)
 
         multiworld.spoiler.to_file(output_path('%s_Spoiler.txt' % outfilebase))
+        write_profile(multiworld)
         logger.info('Done. Skipped multidata modification. Total time: %s', time.perf_counter() - start)
         return multiworld
 
     output = tempfile.TemporaryDirectory()
-    with output as temp_dir:
+    with output as temp_dir, multiworld.profiler.measure("output"):
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
         with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
@@ -371,7 +396,9 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
-            multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
+            with multiworld.profiler.measure("create_playthrough"):
+                multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2,
+                                                       time_limit=get_settings().generator.playthrough_time_limit)
 
         if args.spoiler:
             multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
@@ -383,5 +410,18 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
             for file in os.scandir(temp_dir):
                 zf.write(file.path, arcname=file.name)
 
+    write_profile(multiworld)
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+def write_profile(multiworld: MultiWorld) -> None:
+    """Writes the generation profile next to the output, if the multiworld was generated with profiling."""
+    if not multiworld.profiler.enabled:
+        return
+    profile_path = output_path(f"AP_{multiworld.seed_name}_Profile.json")
+    multiworld.profiler.write(profile_path)
+    logger = logging.getLogger()
+    logger.info(f"Wrote generation profile to {profile_path}")
+    for game, taken in list(multiworld.profiler.get_totals("game").items())[:5]:
+        logger.info(f"Spent {taken:.2f} seconds in world calls of {game}.")
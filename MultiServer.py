@@ -8,6 +8,7 @@ import copy
 import datetime
 import functools
 import hashlib
+import hmac
 import inspect
 import itertools
 import logging
@@ -15,7 +16,9 @@ import math
 import operator
 import pickle
 import random
+import secrets
 import shlex
+import struct
 import threading
 import time
 import typing
@@ -33,6 +36,8 @@ if typing.TYPE_CHECKING:
 import colorama
 import websockets
 from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import Frame, Opcode
+from websockets.protocol import State
 try:
     # ponyorm is a requirement for webhost, not default server, so may not be importable
     from pony.orm.dbapiprovider import OperationalError
@@ -43,7 +48,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, MultiData, Hint, HintStatus
+    SlotType, LocationStore, LocationChecks, MultiData, Hint, HintStatus
 from BaseClasses import ItemClassification
 
 
@@ -58,6 +63,64 @@ server_per_message_deflate_factory = ServerPerMessageDeflateFactory(
     client_max_window_bits=11,
     compress_settings={"memLevel": 4},
 )
+# compresses each message on its own, so broadcast_compressed only has to compress a broadcast once for all connections.
+# Without the context of the previous messages, small messages compress much worse: with these settings a single
+# ItemSend PrintJSON takes about 186 instead of 48 bytes on the wire, a ReceivedItems with one item 94 instead of 23,
+# while batches of texts, as sent by flush_team_texts, only grow by about 30%.
+broadcast_per_message_deflate_factory = ServerPerMessageDeflateFactory(
+    server_no_context_takeover=True,
+    server_max_window_bits=11,
+    client_max_window_bits=11,
+    compress_settings={"memLevel": 4},
+)
+# broadcast_compressed writes its frames to the transport of the connections and checks for a fragmented message being
+# sent the same way websockets.broadcast does, which relies on internals of the legacy protocol of websockets 13
+broadcast_compressed_supported = websockets.version.version.split(".")[0] == "13"
+
+
+def broadcast_compressed(sockets: typing.Iterable["ServerConnection"], msg: str) -> None:
+    """
+    Broadcasts msg like websockets.broadcast, but compresses it once for all connections that compress each message
+    on its own with the same settings, instead of once per connection.
+    Only connections accepted with broadcast_per_message_deflate_factory do so, which requires
+    broadcast_compressed_supported.
+    """
+    data = msg.encode("utf-8")
+    frames: typing.Dict[typing.Tuple[typing.Any, ...], bytes] = {}
+    other_sockets: typing.List["ServerConnection"] = []
+    shard_connections: typing.Dict[FrontLink, typing.List[int]] = {}
+    for socket in sockets:
+        if isinstance(socket, ShardConnection):
+            # the front sends it, so it's compressed once per front instead
+            if socket.open:
+                shard_connections.setdefault(socket.link, []).append(socket.connection_id)
+            continue
+        extensions = socket.extensions
+        if len(extensions) != 1 or not isinstance(extensions[0], PerMessageDeflate) \
+                or not extensions[0].local_no_context_takeover:
+            other_sockets.append(socket)
+            continue
+        if not broadcast_compressed_supported:
+            raise RuntimeError(f"broadcast_compressed does not support websockets {websockets.version.version}")
+        if socket.state is not State.OPEN or socket._fragmented_message_waiter is not None:
+            # let websockets send it, or skip it if the connection can't take it right now
+            other_sockets.append(socket)
+            continue
+        deflate: PerMessageDeflate = extensions[0]
+        key = deflate.local_max_window_bits, *deflate.compress_settings.items()
+        frame = frames.get(key)
+        if frame is None:
+            encoder = PerMessageDeflate(True, True, deflate.remote_max_window_bits, deflate.local_max_window_bits,
+                                        deflate.compress_settings)
+            frame = frames[key] = Frame(Opcode.TEXT, data).serialize(mask=False, extensions=[encoder])
+        try:
+            socket.transport.write(frame)
+        except Exception as e:
+            socket.logger.warning("skipped broadcast: failed to write message: %s", e)
+    if other_sockets:
+        websockets.broadcast(other_sockets, msg)
+    for link, connection_ids in shard_connections.items():
+        link.send(("send", connection_ids, msg))
 
 
 def remove_from_list(container, value):
@@ -133,6 +196,158 @@ def get_saving_second(seed_name: str, interval: int = 60) -> int:
     return int(hashlib.sha256(seed_name.encode()).hexdigest(), 16) % interval
 
 
+class SaveJournal:
+    """
+    Journal of the changes to a save since its last snapshot, appended to a file next to the save instead of rewriting
+    the whole save every time. Loading replays the journal on top of the snapshot. Once the journal grows larger than
+    the snapshot, a new snapshot is written and the journal starts over.
+    """
+    mapping_sections: typing.ClassVar[typing.Tuple[str, ...]] = (
+        "location_checks", "hints", "hints_used", "name_aliases", "client_game_state", "group_collected",
+        "game_options")
+    """save sections that are mappings, journaled per key"""
+    pair_sections: typing.ClassVar[typing.Tuple[str, ...]] = ("client_activity_timers", "client_connection_timers")
+    """save sections that are tuples of (key, value) pairs, journaled per key"""
+    frame_header: typing.ClassVar[struct.Struct] = struct.Struct("<I")
+
+    file_path: str
+    generation: int
+    """counts the snapshots, the journal is only replayed onto the snapshot of the same generation"""
+    size: int
+    snapshot_size: int
+    changed_stored_data: typing.Set[str]
+    """keys of stored_data that were set since the last append, as its values may be modified in place"""
+    _received_items_lengths: typing.Dict[typing.Tuple[int, int, bool], int]
+    _sections: typing.Dict[str, typing.Dict[typing.Any, typing.Any]]
+    _random_state: typing.Any
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.generation = 0
+        self.size = 0
+        self.snapshot_size = 0
+        self.changed_stored_data = set()
+        self._received_items_lengths = {}
+        self._sections = {}
+        self._random_state = None
+
+    @staticmethod
+    def _copy_value(value: typing.Any) -> typing.Any:
+        # sets are the only mutable values in the mapping sections
+        return frozenset(value) if isinstance(value, (set, frozenset)) else value
+
+    @classmethod
+    def _get_mapping(cls, save: typing.Dict[str, typing.Any], section: str) -> typing.Mapping[typing.Any, typing.Any]:
+        if section in cls.pair_sections:
+            return {tuple(key): value for key, value in save.get(section, ())}
+        return save.get(section, {})
+
+    def _write_frame(self, record: typing.Any, mode: str) -> None:
+        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+        data = zlib.compress(pickle.dumps(record))
+        with open(self.file_path, mode) as f:
+            f.write(self.frame_header.pack(len(data)))
+            f.write(data)
+        self.size += self.frame_header.size + len(data)
+
+    def _set_baseline(self, save: typing.Dict[str, typing.Any]) -> None:
+        self._received_items_lengths = {key: len(items) for key, items in save.get("received_items", {}).items()}
+        self._sections = {section: {key: self._copy_value(value)
+                                    for key, value in self._get_mapping(save, section).items()}
+                          for section in self.mapping_sections + self.pair_sections}
+        self._random_state = save.get("random_state")
+
+    def start(self, save: typing.Dict[str, typing.Any], snapshot_size: int) -> None:
+        """Starts a new, empty journal for a snapshot of save that was just written."""
+        self.generation = save["journal_generation"]
+        self.snapshot_size = snapshot_size
+        self.size = 0
+        self._write_frame(("journal", self.generation), "wb")
+        self._set_baseline(save)
+
+    def append(self, save: typing.Dict[str, typing.Any]) -> None:
+        """Appends the changes of save since the last append or start to the journal."""
+        record: typing.Dict[str, typing.Any] = {}
+        received_items: typing.Dict[typing.Tuple[int, int, bool], typing.Tuple[int, typing.List[NetworkItem]]] = {}
+        for key, items in save.get("received_items", {}).items():
+            start = self._received_items_lengths.get(key, 0)
+            if len(items) > start:
+                received_items[key] = start, items[start:]
+        if received_items:
+            record["received_items"] = received_items
+
+        changed_stored_data, self.changed_stored_data = self.changed_stored_data, set()
+        if changed_stored_data:
+            stored_data = save.get("stored_data", {})
+            record["stored_data"] = {key: stored_data[key] for key in changed_stored_data if key in stored_data}
+
+        sections: typing.Dict[str, typing.Dict[typing.Any, typing.Any]] = {}
+        for section in self.mapping_sections + self.pair_sections:
+            current = self._get_mapping(save, section)
+            last = self._sections.get(section, {})
+            changed = {key: value for key, value in current.items() if key not in last or last[key] != value}
+            removed = [key for key in last if key not in current]
+            if changed or removed:
+                record[section] = changed, removed
+                sections[section] = {key: self._copy_value(value) for key, value in current.items()}
+
+        random_state = save.get("random_state")
+        if random_state != self._random_state:
+            record["random_state"] = random_state
+
+        if not record:
+            return
+        try:
+            self._write_frame(record, "ab")
+        except Exception:
+            self.changed_stored_data |= changed_stored_data
+            raise
+        for key, (start, items) in received_items.items():
+            self._received_items_lengths[key] = start + len(items)
+        self._sections.update(sections)
+        self._random_state = random_state
+
+    def replay(self, save: typing.Dict[str, typing.Any]) -> int:
+        """Applies the journal to save, if it belongs to its snapshot, and returns the number of replayed records."""
+        try:
+            with open(self.file_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        records: typing.List[typing.Any] = []
+        offset = 0
+        while offset + self.frame_header.size <= len(data):
+            size, = self.frame_header.unpack_from(data, offset)
+            offset += self.frame_header.size
+            if offset + size > len(data):
+                logging.warning(f"Ignoring incomplete last record of save journal {self.file_path}.")
+                break
+            records.append(restricted_loads(zlib.decompress(data[offset:offset + size])))
+            offset += size
+        if not records or records[0] != ("journal", save.get("journal_generation", 0)):
+            logging.info(f"Ignoring save journal {self.file_path}, as it does not belong to the loaded save.")
+            return 0
+
+        for record in records[1:]:
+            for section, changes in record.items():
+                if section == "received_items":
+                    received_items = save.setdefault("received_items", {})
+                    for key, (start, items) in changes.items():
+                        received_items.setdefault(key, [])[start:] = items
+                elif section == "stored_data":
+                    save.setdefault("stored_data", {}).update(changes)
+                elif section == "random_state":
+                    save["random_state"] = changes
+                else:
+                    changed, removed = changes
+                    mapping = dict(self._get_mapping(save, section))
+                    mapping.update(changed)
+                    for key in removed:
+                        mapping.pop(key, None)
+                    save[section] = tuple(mapping.items()) if section in self.pair_sections else mapping
+        return len(records) - 1
+
+
 class Client(Endpoint):
     __slots__ = (
         "__weakref__",
@@ -224,10 +439,10 @@ class Context:
     clients: typing.Dict[int, typing.Dict[int, typing.List[Client]]]
     endpoints: list[Client]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
-    location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
+    location_checks: LocationChecks
     hints_used: typing.Dict[typing.Tuple[int, int], int]
     groups: typing.Dict[int, typing.Set[int]]
-    save_version = 2
+    save_version = 3
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
@@ -240,6 +455,9 @@ class Context:
     location_name_groups: typing.Dict[str, typing.Dict[str, typing.Set[str]]]
     all_item_and_group_names: typing.Dict[str, typing.Set[str]]
     all_location_and_group_names: typing.Dict[str, typing.Set[str]]
+    # (game, checksum, for_location) -> index of those names, see get_fuzzy_name_index
+    shared_fuzzy_name_indices: typing.ClassVar[typing.Dict[typing.Tuple[str, str, bool], Utils.FuzzyNameIndex]] = {}
+    fuzzy_name_indices: typing.Dict[typing.Tuple[str, bool], Utils.FuzzyNameIndex]
     non_hintable_names: typing.Dict[str, typing.AbstractSet[str]]
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
@@ -254,12 +472,15 @@ class Context:
         self.slot_info = {}
         self.log_network = log_network
         self.endpoints = []
+        # PrintJSON messages per team, to be broadcast together in the next event loop iteration
+        self.pending_team_texts: typing.Dict[int, typing.List[typing.Dict[str, typing.Any]]] = {}
         self.clients = {}
         self.compatibility: int = compatibility
         self.shutdown_task = None
         self.data_filename = None
         self.save_filename = None
         self.saving = False
+        self.save_journal: typing.Optional[SaveJournal] = None
         self.player_names: typing.Dict[team_slot, str] = {}
         self.player_name_lookup: typing.Dict[str, team_slot] = {}
         self.connect_names = {}  # names of slots clients can connect to
@@ -271,13 +492,16 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.new_items_receivers: typing.Set[team_slot] = set()  # sent items by send_items_to, see send_new_items
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
-        self.location_checks = collections.defaultdict(set)
+        self.location_checks = LocationChecks({})
         self.hint_cost = hint_cost
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding player, location) -> slot -> hints of that slot, to find the hints of a location
+        self.hints_by_location: typing.Dict[typing.Tuple[int, int, int], typing.Dict[int, typing.Set[Hint]]] = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -308,6 +532,8 @@ class Context:
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
         self.read_data = {}
         self.spheres = []
+        # player -> location id -> sphere, built from spheres on first use by get_sphere
+        self.location_spheres: typing.Optional[typing.Dict[int, typing.Dict[int, int]]] = None
 
         # init empty to satisfy linter, I suppose
         self.gamespackage = {}
@@ -316,11 +542,18 @@ class Context:
         self.location_name_groups = {}
         self.all_item_and_group_names = {}
         self.all_location_and_group_names = {}
+        self.fuzzy_name_indices = {}
         self.item_names = collections.defaultdict(
             lambda: Utils.KeyedDefaultDict(lambda code: f'Unknown item (ID:{code})'))
         self.location_names = collections.defaultdict(
             lambda: Utils.KeyedDefaultDict(lambda code: f'Unknown location (ID:{code})'))
         self.non_hintable_names = collections.defaultdict(frozenset)
+        # checksum -> JSON of that game's data package, may be shared with other contexts by _load_game_data
+        self.encoded_game_data: typing.Dict[str, str] = {}
+        # JSON of the parts of Connected that are the same for every connection
+        self.encoded_players_package: typing.Optional[typing.Tuple[typing.Tuple[typing.Any, ...], str]] = None
+        self.encoded_slot_info: typing.Optional[str] = None
+        self.encoded_slot_data: typing.Dict[int, str] = {}
 
         self._load_game_data()
 
@@ -361,6 +594,23 @@ class Context:
             self.item_names[game].update(archipelago_item_names)
             self.location_names[game].update(archipelago_location_names)
 
+    def get_fuzzy_name_index(self, game: str, for_location: bool = False) -> Utils.FuzzyNameIndex:
+        """Returns the index of all item or location names and group names of game, to look names up in with
+        get_intended_text. Built on first use, and shared by all contexts of the process if the game has a checksum."""
+        checksum = self.checksums.get(game)
+        if checksum:
+            index = self.shared_fuzzy_name_indices.get((game, checksum, for_location))
+        else:
+            index = self.fuzzy_name_indices.get((game, for_location))
+        if index is None:
+            index = Utils.FuzzyNameIndex(self.all_location_and_group_names[game] if for_location
+                                         else self.all_item_and_group_names[game])
+            if checksum:
+                self.shared_fuzzy_name_indices[game, checksum, for_location] = index
+            else:
+                self.fuzzy_name_indices[game, for_location] = index
+        return index
+
     def item_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["item_name_to_id"] if game in self.gamespackage else None
 
@@ -398,14 +648,17 @@ class Context:
             return True
 
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
+        return self.broadcast_encoded_msgs(endpoints, msg)
+
+    def broadcast_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
         sockets = []
         for endpoint in endpoints:
             if endpoint.socket and endpoint.socket.open:
                 sockets.append(endpoint.socket)
         try:
-            websockets.broadcast(sockets, msg)
+            broadcast_compressed(sockets, msg)
         except RuntimeError:
-            self.logger.exception("Exception during broadcast_send_encoded_msgs")
+            self.logger.exception("Exception during broadcast_encoded_msgs")
             return False
         else:
             if self.log_network:
@@ -436,6 +689,26 @@ class Context:
         )
         async_start(self.broadcast_send_encoded_msgs(endpoints, data))
 
+    def broadcast_team_texts(self, team: int, msgs: typing.List[typing.Dict[str, typing.Any]]) -> None:
+        """Broadcasts PrintJSON msgs to a team in the next event loop iteration, together with the ones of all
+        other calls until then, so that a burst of checks results in few large messages instead of many small ones.
+        They are still sent before any message that was queued after the first of them, like the ReceivedItems of the
+        same checks, only the texts of later checks in the same iteration get ahead of the messages sent in between."""
+        if not self.pending_team_texts:
+            asyncio.get_running_loop().call_soon(self.flush_team_texts)
+        self.pending_team_texts.setdefault(team, []).extend(msgs)
+
+    def flush_team_texts(self) -> None:
+        pending_team_texts, self.pending_team_texts = self.pending_team_texts, {}
+        for team, msgs in pending_team_texts.items():
+            # split into chunks that are close to compression window of 64K but not too big on the wire
+            # (roughly 1300-2600 bytes after compression depending on repetitiveness)
+            for start in range(0, len(msgs), 140):
+                # sent right away instead of in a new task, to stay ahead of the tasks started since queueing them
+                endpoints = (endpoint for endpoint in itertools.chain.from_iterable(self.clients[team].values())
+                             if not endpoint.no_text)
+                self.broadcast_encoded_msgs(endpoints, self.dumper(msgs[start:start + 140]))
+
     def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
         msgs = self.dumper(msgs)
         async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
@@ -506,6 +779,8 @@ class Context:
             self.minimum_client_versions[player] = max(Version(*version), min_version)
 
         self.slot_info = decoded_obj["slot_info"]
+        self.encoded_slot_info = None
+        self.encoded_slot_data.clear()
         self.games = {slot: slot_info.game for slot, slot_info in self.slot_info.items()}
         self.groups = {slot: set(slot_info.group_members) for slot, slot_info in self.slot_info.items()
                        if slot_info.type == SlotType.group}
@@ -528,6 +803,7 @@ class Context:
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        self.location_checks = LocationChecks(self.locations)
         self.slot_data = decoded_obj['slot_data']
         for slot, data in self.slot_data.items():
             self.read_data[f"slot_data_{slot}"] = lambda data=data: data
@@ -539,7 +815,8 @@ class Context:
             self.start_inventory[slot] = [NetworkItem(item_code, -2, 0) for item_code in item_codes]
 
         for slot, hints in decoded_obj["precollected_hints"].items():
-            self.hints[0, slot].update(hints)
+            for hint in hints:
+                self.add_hint(0, slot, hint)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -570,6 +847,7 @@ class Context:
 
         # sorted access spheres
         self.spheres = decoded_obj.get("spheres", [])
+        self.location_spheres = None
 
     # saving
 
@@ -586,32 +864,50 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
-            # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            save_data = self.get_save()
+            if self.save_journal and self.save_journal.size < self.save_journal.snapshot_size:
+                self.save_journal.append(save_data)
+            else:
+                if self.save_journal:
+                    save_data["journal_generation"] = self.save_journal.generation + 1
+                # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                encoded_save = zlib.compress(pickle.dumps(save_data))
+                with open(self.save_filename, "wb") as f:
+                    f.write(encoded_save)
+                if self.save_journal:
+                    self.save_journal.start(save_data, len(encoded_save))
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
             return True
 
-    def init_save(self, enabled: bool = True):
+    def init_save(self, enabled: bool = True, journal: bool = False):
         self.saving = enabled
         if self.saving:
+            import os
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
+            if journal:
+                self.save_journal = SaveJournal(os.path.splitext(self.save_filename)[0] + ".apjournal")
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                if self.save_journal:
+                    self.save_journal.generation = save_data.get("journal_generation", 0)
+                    replayed = self.save_journal.replay(save_data)
+                    if replayed:
+                        self.logger.info(f"Replayed {replayed} records of the save journal.")
+                self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
                 self.logger.exception(e)
+            if self.save_journal:
+                # start a fresh journal on top of a snapshot of what was loaded
+                self._save()
             self._start_async_saving()
 
     def _start_async_saving(self, atexit_save: bool = True):
@@ -653,7 +949,7 @@ class Context:
             "received_items": self.received_items,
             "hints_used": dict(self.hints_used),
             "hints": dict(self.hints),
-            "location_checks": dict(self.location_checks),
+            "location_checks": self.location_checks.get_bitmaps(),
             "name_aliases": self.name_aliases,
             "client_game_state": dict(self.client_game_state),
             "client_activity_timers": tuple(
@@ -682,6 +978,7 @@ class Context:
         self.received_items = savedata["received_items"]
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
+        self.index_hints()
 
         self.name_aliases.update(savedata["name_aliases"])
         self.client_game_state.update(savedata["client_game_state"])
@@ -691,7 +988,7 @@ class Context:
         self.client_activity_timers.update(
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
-        self.location_checks.update(savedata["location_checks"])
+        self.location_checks.load(savedata["location_checks"])
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -729,15 +1026,13 @@ class Context:
         will refresh all teams or all slots respectively. If a set is passed for 'changed', each (team,slot)
         pair that has at least one hint modified will be added to the set.
         """
-        for hint_team, hint_slot in self.hints:
+        for hint_team, hint_slot in list(self.hints):
             if team != hint_team and team is not None:
                 continue  # Check specified team only, all if team is None
             if slot != hint_slot and slot is not None:
                 continue  # Check specified slot only, all if slot is None
-            new_hints: typing.Set[Hint] = set()
-            for hint in self.hints[hint_team, hint_slot]:
+            for hint in list(self.hints[hint_team, hint_slot]):
                 new_hint = hint.re_check(self, hint_team)
-                new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
@@ -745,7 +1040,23 @@ class Context:
                         changed.add((hint_team,player))
                     if slot is not None and slot != player:
                         self.replace_hint(hint_team, player, hint, new_hint)
-            self.hints[hint_team, hint_slot] = new_hints
+                self.replace_hint(hint_team, hint_slot, hint, new_hint)
+
+    def recheck_location_hints(self, team: int, finding_player: int, locations: typing.Iterable[int],
+                               changed: typing.Set[team_slot]) -> None:
+        """Refreshes the hints for the specified locations of finding_player, in all slots that have them.
+        Each (team,slot) pair that has at least one hint modified will be added to the set 'changed'.
+        """
+        for location in locations:
+            slot_hints = self.hints_by_location.get((team, finding_player, location))
+            if not slot_hints:
+                continue
+            for hint_slot, hints in list(slot_hints.items()):
+                for hint in list(hints):
+                    new_hint = hint.re_check(self, team)
+                    if hint != new_hint:
+                        self.replace_hint(team, hint_slot, hint, new_hint)
+                        changed.add((team, hint_slot))
 
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
@@ -754,16 +1065,58 @@ class Context:
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
         if self.spheres:
-            for i, sphere in enumerate(self.spheres):
-                if location_id in sphere.get(player, set()):
-                    return i
-            raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
-                           f"Location or player may not exist.")
+            if self.location_spheres is None:
+                self.location_spheres = {}
+                for i, sphere in reversed(list(enumerate(self.spheres))):  # earliest sphere wins
+                    for sphere_player, location_ids in sphere.items():
+                        player_spheres = self.location_spheres.setdefault(sphere_player, {})
+                        for sphere_location_id in location_ids:
+                            player_spheres[sphere_location_id] = i
+            try:
+                return self.location_spheres[player][location_id]
+            except KeyError:
+                raise KeyError(f"No Sphere found for location ID {location_id} belonging to player {player}. "
+                               f"Location or player may not exist.") from None
         return -1
 
     def get_players_package(self):
         return [NetworkPlayer(t, p, self.get_aliased_name(t, p), n) for (t, p), n in self.player_names.items()]
 
+    def get_encoded_game_data(self, game: str) -> str:
+        """Returns the data package of a game as JSON, encoded once per checksum."""
+        game_data = self.gamespackage[game]
+        checksum = game_data.get("checksum")
+        if checksum is None:
+            return self.dumper(game_data)
+        encoded = self.encoded_game_data.get(checksum)
+        if encoded is None:
+            encoded = self.encoded_game_data[checksum] = self.dumper(game_data)
+        return encoded
+
+    def get_encoded_data_package(self, games: typing.Iterable[str]) -> str:
+        """Returns a DataPackage message with the given games, assembled from their cached JSON."""
+        return '[{"cmd":"DataPackage","data":{"games":{' + ",".join(
+            f"{self.dumper(game)}:{self.get_encoded_game_data(game)}" for game in games) + "}}}]"
+
+    def get_encoded_connected(self, connected_packet: typing.Dict[str, typing.Any], slot: int,
+                              with_slot_data: bool) -> str:
+        """Returns connected_packet as JSON, with players, slot_info and optionally slot_data added from cache."""
+        aliases = tuple(self.name_aliases.items())
+        if self.encoded_players_package is None or self.encoded_players_package[0] != aliases:
+            self.encoded_players_package = aliases, self.dumper(self.get_players_package())
+        if self.encoded_slot_info is None:
+            self.encoded_slot_info = self.dumper(self.slot_info)
+        parts = [self.dumper(connected_packet)[:-1],
+                 ',"players":', self.encoded_players_package[1],
+                 ',"slot_info":', self.encoded_slot_info]
+        if with_slot_data:
+            encoded_slot_data = self.encoded_slot_data.get(slot)
+            if encoded_slot_data is None:
+                encoded_slot_data = self.encoded_slot_data[slot] = self.dumper(self.slot_data[slot])
+            parts += ',"slot_data":', encoded_slot_data
+        parts.append("}")
+        return "".join(parts)
+
     def slot_set(self, slot) -> typing.Set[int]:
         """Returns the slot IDs that concern that slot,
         as in expands groups out and returns back the input for solo."""
@@ -816,10 +1169,10 @@ class Context:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
+                    self.add_hint(team, hint.finding_player, hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
+                        self.add_hint(team, player, hint)
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
@@ -835,15 +1188,36 @@ class Context:
                     async_start(self.send_msgs(client, client_hints))
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location and hint.finding_player == finding_player:
-                return hint
+        hints = self.hints_by_location.get((team, finding_player, seeked_location), {}).get(finding_player)
+        if hints:
+            return next(iter(hints))
         return None
-    
+
+    def add_hint(self, team: int, slot: int, hint: Hint) -> None:
+        self.hints[team, slot].add(hint)
+        self.hints_by_location.setdefault((team, hint.finding_player, hint.location), {}) \
+            .setdefault(slot, set()).add(hint)
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
-            self.hints[team, slot].add(new_hint)
+            key = team, old_hint.finding_player, old_hint.location
+            slot_hints = self.hints_by_location.get(key, {})
+            if slot in slot_hints:
+                slot_hints[slot].discard(old_hint)
+                if not slot_hints[slot]:
+                    del slot_hints[slot]
+                    if not slot_hints:
+                        del self.hints_by_location[key]
+            self.add_hint(team, slot, new_hint)
+
+    def index_hints(self) -> None:
+        """Rebuilds hints_by_location, after hints were replaced as a whole."""
+        self.hints_by_location.clear()
+        for (team, slot), hints in self.hints.items():
+            for hint in hints:
+                self.hints_by_location.setdefault((team, hint.finding_player, hint.location), {}) \
+                    .setdefault(slot, set()).add(hint)
     
     # "events"
 
@@ -910,6 +1284,243 @@ async def server(websocket: "ServerConnection", path: str = "/", ctx: Context =
         await ctx.disconnect(client)
 
 
+# sharded mode: front processes accept the websocket connections and do the framing, compression and JSON,
+# and forward the decoded commands over a local link to the process that owns the Context.
+# Link messages are pickled tuples, prefixed by their size. After a token, sent once they are serving, fronts send
+# ("open", connection id, remote address, deflate parameters or None), ("msgs", connection id, msgs) and
+# ("close", connection id), and receive ("send", connection ids, encoded msgs) and ("close", connection id).
+
+link_header = struct.Struct("<I")
+
+
+class FrontLink:
+    """Link to a front process, in the process that owns the Context."""
+    writer: asyncio.StreamWriter
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+
+    def send(self, message: typing.Tuple[typing.Any, ...]) -> None:
+        if not self.writer.is_closing():
+            data = pickle.dumps(message)
+            self.writer.write(link_header.pack(len(data)) + data)
+
+
+class ShardConnection:
+    """Stands in for the websocket of a client connected to a front, in the process that owns the Context."""
+    link: FrontLink
+    connection_id: int
+    remote_address: typing.Any
+    extensions: typing.List[PerMessageDeflate]
+    open: bool
+
+    def __init__(self, link: FrontLink, connection_id: int, remote_address: typing.Any,
+                 deflate_parameters: typing.Optional[typing.Tuple[bool, bool, int, int]]) -> None:
+        self.link = link
+        self.connection_id = connection_id
+        self.remote_address = remote_address
+        self.extensions = [PerMessageDeflate(*deflate_parameters)] if deflate_parameters else []
+        self.open = True
+
+    async def send(self, msg: str) -> None:
+        self.link.send(("send", [self.connection_id], msg))
+
+    async def close(self) -> None:
+        self.link.send(("close", self.connection_id))
+
+
+async def read_link_message(reader: asyncio.StreamReader) -> typing.Tuple[typing.Any, ...]:
+    size, = link_header.unpack(await reader.readexactly(link_header.size))
+    # links are only established by the fronts this server started, see serve_front
+    return pickle.loads(await reader.readexactly(size))
+
+
+async def serve_front_client(ctx: Context, client: Client, messages: asyncio.Queue) -> None:
+    """Runs the commands of one client of a front in order, so a slow command doesn't hold up the other clients.
+    Ends when None is queued."""
+    try:
+        await on_client_connected(ctx, client)
+        while True:
+            msgs = await messages.get()
+            if msgs is None:
+                break
+            if ctx.log_network:
+                ctx.logger.info(f"Incoming message: {msgs}")
+            for msg in msgs:
+                await process_client_cmd(ctx, client, msg)
+    except Exception as e:
+        ctx.logger.exception(e)
+        await client.socket.close()
+    finally:
+        if ctx.log_network:
+            ctx.logger.info("Disconnected")
+        client.socket.open = False
+        await ctx.disconnect(client)
+
+
+async def serve_front(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ctx: Context, token: bytes,
+                      on_linked: typing.Optional[typing.Callable[[], None]] = None) -> None:
+    """Handles the link of a front process, in the process that owns the Context.
+    on_linked is called once the front authenticated, which it does when it is serving."""
+    link = FrontLink(writer)
+    connections: typing.Dict[int, asyncio.Queue] = {}
+    client_tasks: typing.Set[asyncio.Task] = set()
+    try:
+        if not hmac.compare_digest(await reader.readexactly(len(token)), token):
+            ctx.logger.warning("Rejected link with an invalid token.")
+            return
+        if on_linked:
+            on_linked()
+        while True:
+            kind, connection_id, *data = await read_link_message(reader)
+            if kind == "msgs":
+                messages = connections.get(connection_id)
+                if messages:
+                    messages.put_nowait(data[0])
+            elif kind == "open":
+                if ctx.log_network:
+                    ctx.logger.info("Incoming connection")
+                client = Client(ShardConnection(link, connection_id, *data), ctx)
+                ctx.endpoints.append(client)
+                messages = connections[connection_id] = asyncio.Queue()
+                client_task = asyncio.create_task(serve_front_client(ctx, client, messages))
+                client_tasks.add(client_task)
+                client_task.add_done_callback(client_tasks.discard)
+            elif kind == "close":
+                messages = connections.pop(connection_id, None)
+                if messages:
+                    messages.put_nowait(None)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass  # front stopped
+    finally:
+        for messages in connections.values():
+            messages.put_nowait(None)
+        if client_tasks:
+            await asyncio.wait(client_tasks)
+        writer.close()
+
+
+async def run_front(host: typing.Optional[str], port: int, link_port: int, token: bytes,
+                    ssl_context: typing.Optional["ssl.SSLContext"] = None,
+                    compress_broadcasts_once: bool = False) -> None:
+    """Accepts websocket connections on a port shared with the other fronts, and forwards them to link_port."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", link_port)
+    link = FrontLink(writer)
+    sockets: typing.Dict[int, "ServerConnection"] = {}
+    connection_ids = itertools.count(1)
+
+    async def handle_connection(websocket: "ServerConnection", path: str = "/") -> None:
+        connection_id = next(connection_ids)
+        sockets[connection_id] = websocket
+        deflate = next((extension for extension in websocket.extensions
+                        if isinstance(extension, PerMessageDeflate)), None)
+        deflate_parameters = (deflate.remote_no_context_takeover, deflate.local_no_context_takeover,
+                              deflate.remote_max_window_bits, deflate.local_max_window_bits) if deflate else None
+        link.send(("open", connection_id, websocket.remote_address, deflate_parameters))
+        try:
+            async for data in websocket:
+                link.send(("msgs", connection_id, decode(data)))
+                await writer.drain()
+        except Exception as e:
+            if not isinstance(e, websockets.WebSocketException):
+                logging.exception(e)
+        finally:
+            del sockets[connection_id]
+            link.send(("close", connection_id))
+
+    deflate_factory = broadcast_per_message_deflate_factory if compress_broadcasts_once \
+        else server_per_message_deflate_factory
+    front_server = await websockets.serve(handle_connection, host, port, ssl=ssl_context,
+                                          extensions=[deflate_factory], reuse_port=True)
+    # authenticate once serving, so the server knows all fronts accept connections when they are linked
+    writer.write(token)
+    try:
+        while True:
+            kind, *data = await read_link_message(reader)
+            if kind == "send":
+                connection_ids_to, msg = data
+                broadcast_compressed([sockets[connection_id] for connection_id in connection_ids_to
+                                      if connection_id in sockets], msg)
+            elif kind == "close" and data[0] in sockets:
+                async_start(sockets[data[0]].close())
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass  # server stopped
+    finally:
+        front_server.close()
+        await front_server.wait_closed()
+
+
+def run_front_process(index: int, host: typing.Optional[str], port: int, link_port: int, token: bytes,
+                      cert: typing.Optional[str], cert_key: typing.Optional[str], loglevel: str,
+                      compress_broadcasts_once: bool) -> None:
+    Utils.init_logging(name=f"ServerFront{index}", loglevel=loglevel)
+    ssl_context = load_server_cert(cert, cert_key) if cert else None
+    asyncio.run(run_front(host, port, link_port, token, ssl_context, compress_broadcasts_once))
+
+
+class ShardedServer:
+    """Starts the front processes of the sharded mode. Awaitable and closable like the server of websockets.serve."""
+    ws_server: ShardedServer
+    link_server: typing.Optional[asyncio.Server]
+    processes: typing.List[typing.Any]
+    linked_fronts: int
+    compress_broadcasts_once: bool
+    start_timeout: float = 60  # seconds for all fronts to start serving
+
+    def __init__(self, ctx: Context, fronts: int, cert: typing.Optional[str], cert_key: typing.Optional[str],
+                 loglevel: str, compress_broadcasts_once: bool = False) -> None:
+        self.ctx = ctx
+        self.fronts = fronts
+        self.cert = cert
+        self.cert_key = cert_key
+        self.loglevel = loglevel
+        self.compress_broadcasts_once = compress_broadcasts_once
+        self.ws_server = self
+        self.link_server = None
+        self.processes = []
+        self.linked_fronts = 0
+
+    def __await__(self) -> typing.Generator[typing.Any, None, ShardedServer]:
+        return self.start().__await__()
+
+    def _front_linked(self) -> None:
+        self.linked_fronts += 1
+
+    async def start(self) -> ShardedServer:
+        """Starts the fronts and waits until all of them are serving."""
+        import multiprocessing
+        token = secrets.token_bytes(32)
+        self.link_server = await asyncio.start_server(
+            functools.partial(serve_front, ctx=self.ctx, token=token, on_linked=self._front_linked), "127.0.0.1", 0)
+        link_port = self.link_server.sockets[0].getsockname()[1]
+        spawn_context = multiprocessing.get_context("spawn")
+        for index in range(self.fronts):
+            process = spawn_context.Process(target=run_front_process, name=f"ServerFront{index}", daemon=True,
+                                            args=(index, self.ctx.host, self.ctx.port, link_port, token,
+                                                  self.cert, self.cert_key, self.loglevel,
+                                                  self.compress_broadcasts_once))
+            process.start()
+            self.processes.append(process)
+        deadline = time.monotonic() + self.start_timeout
+        while self.linked_fronts < self.fronts:
+            stopped = next((process for process in self.processes if process.exitcode is not None), None)
+            if stopped:
+                self.close()
+                raise RuntimeError(f"{stopped.name} exited with code {stopped.exitcode} before it was serving.")
+            if time.monotonic() > deadline:
+                self.close()
+                raise TimeoutError(f"Only {self.linked_fronts} of {self.fronts} fronts were serving "
+                                   f"after {self.start_timeout} seconds.")
+            await asyncio.sleep(0.1)
+        return self
+
+    def close(self) -> None:
+        if self.link_server:
+            self.link_server.close()
+        for process in self.processes:
+            process.terminate()
+
+
 async def on_client_connected(ctx: Context, client: Client):
     players = []
     for team, clients in ctx.clients.items():
@@ -1065,21 +1676,24 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
-def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+def send_new_items(ctx: Context, receivers: typing.Optional[typing.Iterable[team_slot]] = None):
+    """Sends new items to the clients of receivers,
+    by default the ones that were sent items by send_items_to since the last call."""
+    if receivers is None:
+        receivers, ctx.new_items_receivers = ctx.new_items_receivers, set()
+    for team, slot in receivers:
+        for client in ctx.clients[team].get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                async_start(ctx.send_msgs(client, [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -1118,7 +1732,12 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
 
 
 def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tuple[int, int]]:
-    return ctx.locations.get_remaining(ctx.location_checks, team, slot)
+    slot_locations = ctx.locations[slot]
+    remaining: typing.List[typing.Tuple[int, int]] = []
+    for location_id in ctx.location_checks[team, slot].get_missing():
+        item_id, receiving_player, _ = slot_locations[location_id]
+        remaining.append((receiving_player, item_id))
+    return sorted(remaining)
 
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
@@ -1127,6 +1746,7 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.new_items_receivers.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1153,13 +1773,8 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
                 ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location]))
-            if len(info_texts) >= 140:
-                # split into chunks that are close to compression window of 64K but not too big on the wire
-                # (roughly 1300-2600 bytes after compression depending on repetitiveness)
-                ctx.broadcast_team(team, info_texts)
-                info_texts.clear()
             info_texts.append(json_format_send_event(new_item, target_player))
-        ctx.broadcast_team(team, info_texts)
+        ctx.broadcast_team_texts(team, info_texts)
         del info_texts
         del sortable
 
@@ -1171,7 +1786,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1667,7 +2282,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
                     {"type": "ItemCheat", "team": self.client.team, "receiving": self.client.slot, "item": new_item})
-                send_new_items(self.ctx)
+                send_new_items(self.ctx, [(self.client.team, self.client.slot)])
                 return True
             else:
                 self.output(response)
@@ -1680,9 +2295,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         points_available = get_client_points(self.ctx, self.client)
         cost = self.ctx.get_hint_cost(self.client.slot)
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.get_rechecked_hints(self.client.team, self.client.slot)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1713,10 +2326,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
             if game not in self.ctx.all_item_and_group_names:
                 self.output("Can't look up item/location for unknown game. Hint for ID instead.")
                 return False
-            names = self.ctx.all_location_and_group_names[game] \
-                if for_location else \
-                self.ctx.all_item_and_group_names[game]
-            hint_name, usable, response = get_intended_text(input_text, names)
+            hint_name, usable, response = get_intended_text(input_text,
+                                                            self.ctx.get_fuzzy_name_index(game, for_location))
 
             if usable:
                 if hint_name in self.ctx.non_hintable_names[game]:
@@ -1823,11 +2434,11 @@ class ClientMessageProcessor(CommonCommandProcessor):
 
 
 def get_checked_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_checked(ctx.location_checks, team, slot)
+    return ctx.location_checks[team, slot].get_checked()
 
 
 def get_missing_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_missing(ctx.location_checks, team, slot)
+    return ctx.location_checks[team, slot].get_missing()
 
 
 def get_client_points(ctx: Context, client: Client) -> int:
@@ -1840,7 +2451,7 @@ def get_slot_points(ctx: Context, team: int, slot: int) -> int:
             ctx.get_hint_cost(slot) * ctx.hints_used[team, slot])
 
 
-async def process_client_cmd(ctx: Context, client: Client, args: dict):
+async def process_client_cmd(ctx: Context, client: Client, args: typing.Dict[str, typing.Any]) -> None:
     try:
         cmd: str = args["cmd"]
     except:
@@ -1908,13 +2519,11 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             connected_packet = {
                 "cmd": "Connected",
                 "team": client.team, "slot": client.slot,
-                "players": ctx.get_players_package(),
                 "missing_locations": get_missing_checks(ctx, team, slot),
                 "checked_locations": get_checked_checks(ctx, team, slot),
-                "slot_info": ctx.slot_info,
                 "hint_points": get_slot_points(ctx, team, slot),
             }
-            reply = [connected_packet]
+            reply = []
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
@@ -1923,30 +2532,25 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
                 await on_client_joined(ctx, client)
-            if args.get("slot_data", True):
-                connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
+            # players, slot_info and slot_data are the same for every connection, so they are encoded only once
+            encoded_reply = [ctx.get_encoded_connected(connected_packet, client.slot, args.get("slot_data", True))]
+            encoded_reply.extend(ctx.dumper(msg) for msg in reply)
+            await ctx.send_encoded_msgs(client, "[" + ",".join(encoded_reply) + "]")
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            games = set(args.get("games", []))
+            await ctx.send_encoded_msgs(client, ctx.get_encoded_data_package(
+                name for name in ctx.gamespackage if name in games))
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
+            await ctx.send_encoded_msgs(client, ctx.get_encoded_data_package(
+                name for name in ctx.gamespackage if name not in exclusions))
 
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            await ctx.send_encoded_msgs(client, ctx.get_encoded_data_package(ctx.gamespackage))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -2175,6 +2779,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            if ctx.save_journal:
+                ctx.save_journal.changed_stored_data.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", False):
                 targets.add(client)
@@ -2431,7 +3037,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 item, usable, response = int(full_name), True, None
             elif game in self.ctx.all_item_and_group_names:
-                item, usable, response = get_intended_text(full_name, self.ctx.all_item_and_group_names[game])
+                item, usable, response = get_intended_text(full_name, self.ctx.get_fuzzy_name_index(game))
             else:
                 self.output("Can't look up item for unknown game. Hint for ID instead.")
                 return False
@@ -2470,7 +3076,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif game in self.ctx.all_location_and_group_names:
-                location, usable, response = get_intended_text(full_name, self.ctx.all_location_and_group_names[game])
+                location, usable, response = get_intended_text(full_name, self.ctx.get_fuzzy_name_index(game, True))
             else:
                 self.output("Can't look up location for unknown game. Hint for ID instead.")
                 return False
@@ -2566,6 +3172,7 @@ async def console(ctx: Context):
 
 
 def parse_args() -> argparse.Namespace:
+    import socket
     from settings import get_settings
 
     parser = argparse.ArgumentParser()
@@ -2577,7 +3184,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--password', default=defaults["password"])
     parser.add_argument('--savefile', default=defaults["savefile"])
     parser.add_argument('--disable_save', default=defaults["disable_save"], action='store_true')
+    parser.add_argument('--save_journal', default=defaults["save_journal"], action='store_true',
+                        help="Append changes to a journal next to the save file, instead of rewriting it every save.")
     parser.add_argument('--cert', help="Path to a SSL Certificate for encryption.")
+    parser.add_argument('--fronts', default=0, type=int,
+                        help="Number of processes that accept the connections on the shared port, and handle their "
+                             "compression and JSON for this process. 0 handles everything in this process. "
+                             "Requires SO_REUSEPORT, so not available on Windows.")
+    parser.add_argument('--compress_broadcasts_once', action='store_true',
+                        help="Compress each message on its own, so broadcasts only have to be compressed once for all "
+                             "connections, at the cost of compressing small messages worse.")
     parser.add_argument('--cert_key', help="Path to SSL Certificate Key file")
     parser.add_argument('--loglevel', default=defaults["loglevel"],
                         choices=['debug', 'info', 'warning', 'error', 'critical'])
@@ -2632,6 +3248,10 @@ def parse_args() -> argparse.Namespace:
     """)
     parser.add_argument('--log_network', default=defaults["log_network"], action="store_true")
     args = parser.parse_args()
+    if args.fronts and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--fronts requires SO_REUSEPORT, which this platform does not support.")
+    if args.compress_broadcasts_once and not broadcast_compressed_supported:
+        parser.error(f"--compress_broadcasts_once does not support websockets {websockets.version.version}.")
     return args
 
 
@@ -2707,17 +3327,22 @@ async def main(args: argparse.Namespace):
         logging.exception(f"Failed to read multiworld data ({e})")
         raise
 
-    ctx.init_save(not args.disable_save)
+    ctx.init_save(not args.disable_save, journal=args.save_journal)
 
     ssl_context = load_server_cert(args.cert, args.cert_key) if args.cert else None
 
-    ctx.server = websockets.serve(
-        functools.partial(server, ctx=ctx),
-        host=ctx.host,
-        port=ctx.port,
-        ssl=ssl_context,
-        extensions=[server_per_message_deflate_factory],
-    )
+    if args.fronts:
+        ctx.server = ShardedServer(ctx, args.fronts, args.cert, args.cert_key, args.loglevel,
+                                   args.compress_broadcasts_once)
+    else:
+        ctx.server = websockets.serve(
+            functools.partial(server, ctx=ctx),
+            host=ctx.host,
+            port=ctx.port,
+            ssl=ssl_context,
+            extensions=[broadcast_per_message_deflate_factory if args.compress_broadcasts_once
+                        else server_per_message_deflate_factory],
+        )
     ip = args.host if args.host else Utils.get_public_ipv4()
     logging.info('Hosting game at %s:%d (%s)' % (ip, ctx.port,
                                                  'No password' if not ctx.password else 'Password: %s' % ctx.password))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping, MutableSet, Sequence
 import typing
 import enum
 import warnings
@@ -415,6 +416,11 @@ class Hint(typing.NamedTuple):
 
 
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    # receiving player -> item id -> (finding player, location id, item flags), sorted by finding player and location.
+    # Built on first use, so rooms that never hint or collect don't need the memory. Locations are not meant to be
+    # modified after creation, which would make the index stale.
+    _receiver_index: typing.Optional[typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]]]
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
 
@@ -427,21 +433,36 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
         if len(self.get(0, {})):
             raise ValueError("Invalid player id 0 for location")
 
+        self._receiver_index = None
+
+    def _get_receiver_index(self) -> typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]]:
+        if self._receiver_index is None:
+            receiver_index: typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]] = {}
+            for finding_player, check_data in sorted(self.items()):
+                for location_id, (item_id, receiving_player, item_flags) in sorted(check_data.items()):
+                    receiver_index.setdefault(receiving_player, {}).setdefault(item_id, []).append(
+                        (finding_player, location_id, item_flags))
+            self._receiver_index = receiver_index
+        return self._receiver_index
+
     def find_item(self, slots: typing.Set[int], seeked_item_id: int
                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
-        for finding_player, check_data in self.items():
-            for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+        receiver_index = self._get_receiver_index()
+        found: typing.List[typing.Tuple[int, int, int, int, int]] = []
+        for receiving_player in slots:
+            for finding_player, location_id, item_flags in receiver_index.get(receiving_player, {}).get(
+                    seeked_item_id, ()):
+                found.append((finding_player, location_id, seeked_item_id, receiving_player, item_flags))
+        if len(slots) > 1:
+            found.sort()
+        yield from found
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
-        import collections
-        all_locations: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-        for source_slot, location_data in self.items():
-            for location_id, values in location_data.items():
-                if values[1] == slot:
-                    all_locations[source_slot].add(location_id)
-        return all_locations
+        all_locations: typing.Dict[int, typing.Set[int]] = {}
+        for locations in self._get_receiver_index().get(slot, {}).values():
+            for finding_player, location_id, _ in locations:
+                all_locations.setdefault(finding_player, set()).add(location_id)
+        return {source_slot: all_locations[source_slot] for source_slot in sorted(all_locations)}
 
     def get_checked(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
                     ) -> typing.List[int]:
@@ -474,6 +495,109 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                         location_id not in checked])
 
 
+class CheckedLocations(MutableSet[int]):
+    """
+    Set of the checked locations of a slot, stored as a bitmap over the slot's sorted location ids.
+    Only the slot's locations can be added. Set operations with other iterables return a regular set.
+    """
+    __slots__ = ("locations", "bits")
+    locations: Sequence[int]
+    """sorted location ids of the slot, shared by all teams"""
+    bits: int
+    """bit n is set if locations[n] is checked"""
+
+    def __init__(self, locations: Sequence[int], bits: int = 0) -> None:
+        self.locations = locations
+        self.bits = bits
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[int]) -> typing.Set[int]:
+        return set(it)
+
+    def _select(self, bits: int) -> typing.List[int]:
+        # formatting is the fastest way to iterate the bits of a large int
+        return [location for location, bit in zip(self.locations, reversed(f"{bits:b}")) if bit == "1"]
+
+    def _ordinal(self, location: int) -> int:
+        ordinal = bisect_left(self.locations, location)
+        if ordinal == len(self.locations) or self.locations[ordinal] != location:
+            return -1
+        return ordinal
+
+    def __contains__(self, location: object) -> bool:
+        if not isinstance(location, int):
+            return False
+        ordinal = self._ordinal(location)
+        return ordinal >= 0 and bool(self.bits >> ordinal & 1)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._select(self.bits))
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({set(self)})"
+
+    def add(self, location: int) -> None:
+        ordinal = self._ordinal(location)
+        if ordinal < 0:
+            raise KeyError(location)
+        self.bits |= 1 << ordinal
+
+    def discard(self, location: int) -> None:
+        ordinal = self._ordinal(location)
+        if ordinal >= 0:
+            self.bits &= ~(1 << ordinal)
+
+    def get_checked(self) -> typing.List[int]:
+        """Returns the checked locations in order."""
+        return self._select(self.bits)
+
+    def get_missing(self) -> typing.List[int]:
+        """Returns the locations that are not checked yet in order."""
+        if not self.bits:
+            return list(self.locations)
+        return self._select(self.bits ^ ((1 << len(self.locations)) - 1))
+
+
+class LocationChecks(typing.Dict[typing.Tuple[int, int], CheckedLocations]):
+    """(team, slot) -> checked locations of the slot, creating empty ones for each slot of locations on access."""
+    locations: Mapping[int, Iterable[int]]
+    slot_locations: typing.Dict[int, typing.List[int]]
+    """slot -> sorted location ids, which give the bit of each location"""
+
+    def __init__(self, locations: Mapping[int, Iterable[int]]) -> None:
+        super().__init__()
+        self.locations = locations
+        self.slot_locations = {}
+
+    def __missing__(self, key: typing.Tuple[int, int]) -> CheckedLocations:
+        team, slot = key
+        slot_locations = self.slot_locations.get(slot)
+        if slot_locations is None:
+            slot_locations = self.slot_locations[slot] = sorted(self.locations[slot])
+        checked = self[key] = CheckedLocations(slot_locations)
+        return checked
+
+    def get_bitmaps(self) -> typing.Dict[typing.Tuple[int, int], int]:
+        """Returns the bitmap of checked locations of each (team, slot) that has any, for saving."""
+        return {key: checked.bits for key, checked in self.items() if checked.bits}
+
+    def load(self, location_checks: Mapping[typing.Tuple[int, int], typing.Union[int, Iterable[int]]]) -> None:
+        """Loads saved checks, either bitmaps or, from older saves, sets of location ids."""
+        for key, checked in location_checks.items():
+            if isinstance(checked, int):
+                self[key].bits = checked
+            else:
+                slot_checks = self[key]
+                for location in checked:
+                    try:
+                        slot_checks.add(location)
+                    except KeyError:
+                        pass  # ignore location IDs unknown to this multidata
+
+
 class MinimumVersions(typing.TypedDict):
     server: tuple[int, int, int]
     clients: dict[int, tuple[int, int, int]]
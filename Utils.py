@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import concurrent.futures
+import contextlib
 import json
 import typing
 import builtins
@@ -13,8 +15,11 @@ import pickle
 import functools
 import io
 import collections
+import collections.abc
 import importlib
 import logging
+import threading
+import time
 import warnings
 
 from argparse import Namespace
@@ -528,6 +533,106 @@ class KeyedDefaultDict(collections.defaultdict):
         return value
 
 
+class CopyOnAccessDict(dict):
+    """
+    dict that shares its values with other instances through a read-only snapshot. A value is copied out of the
+    snapshot the first time its key is accessed on an instance, as any access may be followed by a write to the value.
+    """
+    __slots__ = ("shared",)
+    shared: typing.Dict[typing.Any, typing.Any]
+
+    def __init__(self, shared: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None) -> None:
+        super().__init__()
+        self.shared = shared if shared is not None else {}
+
+    def share(self) -> "CopyOnAccessDict":
+        """Moves the values accessed so far into the snapshot and returns a new instance sharing it."""
+        if dict.__len__(self):
+            shared = self.shared.copy()
+            shared.update(dict.items(self))
+            self.shared = shared
+            dict.clear(self)
+        return CopyOnAccessDict(self.shared)
+
+    def materialize(self) -> None:
+        """Copies all values that have not been accessed yet out of the snapshot."""
+        for key in self.shared:
+            if not dict.__contains__(self, key):
+                self.__missing__(key)
+
+    def __missing__(self, key: typing.Any) -> typing.Any:
+        self[key] = value = self.shared[key].copy()
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self.shared
+
+    def __delitem__(self, key: typing.Any) -> None:
+        if key in self.shared:
+            self.shared = {k: v for k, v in self.shared.items() if k != key}
+            if not dict.__contains__(self, key):
+                return
+        dict.__delitem__(self, key)
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        yield from self.shared
+        for key in dict.__iter__(self):
+            if key not in self.shared:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.shared) + sum(1 for key in dict.__iter__(self) if key not in self.shared)
+
+    def __eq__(self, other: object) -> bool:
+        self.materialize()
+        if isinstance(other, CopyOnAccessDict):
+            other.materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        self.materialize()
+        return dict.__repr__(self)
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        self.materialize()
+        return dict, (dict(dict.items(self)),)
+
+    def get(self, key: typing.Any, default: typing.Any = None) -> typing.Any:
+        return self[key] if key in self else default
+
+    def keys(self) -> typing.KeysView[typing.Any]:
+        return collections.abc.KeysView(self)
+
+    def values(self) -> typing.ValuesView[typing.Any]:
+        self.materialize()
+        return dict.values(self)
+
+    def items(self) -> typing.ItemsView[typing.Any, typing.Any]:
+        self.materialize()
+        return dict.items(self)
+
+    def copy(self) -> typing.Dict[typing.Any, typing.Any]:
+        self.materialize()
+        return dict(dict.items(self))
+
+    def pop(self, key: typing.Any, *default: typing.Any) -> typing.Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def setdefault(self, key: typing.Any, default: typing.Any = None) -> typing.Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+
 def get_text_between(text: str, start: str, end: str) -> str:
     return text[text.index(start) + len(start): text.rindex(end)]
 
@@ -673,30 +778,116 @@ def format_SI_prefix(value, power=1000, power_labels=("", "k", "M", "G", "T", "P
     return f"{value.quantize(decimal.Decimal('1.00'))} {chaining_prefix(n, power_labels)}"
 
 
-def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit: typing.Optional[int] = None) \
-        -> typing.List[typing.Tuple[str, int]]:
-    import jellyfish
-
-    def get_fuzzy_ratio(word1: str, word2: str) -> float:
-        if word1 == word2:
-            return 1.01
-        return (1 - jellyfish.damerau_levenshtein_distance(word1.lower(), word2.lower())
-                / max(len(word1), len(word2)))
-
-    limit = limit if limit else len(word_list)
-    return list(
-        map(
-            lambda container: (container[0], int(container[1]*100)),  # convert up to limit to int %
-            sorted(
-                map(lambda candidate: (candidate, get_fuzzy_ratio(input_word, candidate)), word_list),
-                key=lambda element: element[1],
-                reverse=True
-            )[0:limit]
-        )
-    )
-
-
-def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bool, str]:
+class FuzzyNameIndex:
+    """
+    Index over names for get_fuzzy_results. Instead of computing the edit distance to every name, names are tried
+    in order of an upper bound of their ratio, derived from their length and characters, until no remaining name can
+    make it into the results anymore.
+    """
+    names: typing.Tuple[str, ...]
+    lowered_lengths: typing.List[int]
+    char_masks: typing.List[int]
+    """bit per character that appears in each name, case-insensitive"""
+    char_bits: typing.Dict[str, int]
+    positions: typing.Dict[str, typing.List[int]]
+    unbounded_positions: typing.List[int]
+    """names that can't be bounded, as their characters don't match the graphemes the edit distance works on"""
+
+    @staticmethod
+    def _is_bounded(lowered: str) -> bool:
+        # below the combining diacritical marks, every character but \r\n is a grapheme on its own
+        return not lowered or (max(lowered) < "\u0300" and "\r" not in lowered)
+
+    def __init__(self, names: typing.Iterable[str]) -> None:
+        self.names = tuple(names)
+        self.lowered_lengths = []
+        self.char_masks = []
+        self.char_bits = {}
+        self.positions = {}
+        self.unbounded_positions = []
+        for position, name in enumerate(self.names):
+            lowered = name.lower()
+            if not self._is_bounded(lowered):
+                self.unbounded_positions.append(position)
+            mask = 0
+            for char in set(lowered):
+                bit = self.char_bits.get(char)
+                if bit is None:
+                    bit = self.char_bits[char] = 1 << len(self.char_bits)
+                mask |= bit
+            self.lowered_lengths.append(len(lowered))
+            self.char_masks.append(mask)
+            self.positions.setdefault(name, []).append(position)
+
+    def get_results(self, input_word: str, limit: typing.Optional[int] = None) -> typing.List[typing.Tuple[str, int]]:
+        import jellyfish
+
+        limit = limit if limit else len(self.names)
+        lowered_input = input_word.lower()
+        input_length = len(input_word)
+        lowered_input_length = len(lowered_input)
+        input_mask = 0
+        unknown_chars = 0  # never appear in a name, so always have to be added
+        for char in set(lowered_input):
+            bit = self.char_bits.get(char)
+            if bit is None:
+                unknown_chars += 1
+            else:
+                input_mask |= bit
+
+        if self._is_bounded(lowered_input):
+            # The edit distance is at least the difference in length, and at least the number of distinct
+            # characters only found in one of the words, as each edit adds or removes at most one character.
+            bounds = [
+                1 - max(abs(lowered_input_length - lowered_length),
+                        (input_mask & ~mask).bit_count() + unknown_chars,
+                        (mask & ~input_mask).bit_count())
+                / (max(input_length, len(name)) or 1)
+                for name, lowered_length, mask in zip(self.names, self.lowered_lengths, self.char_masks)
+            ]
+            for position in itertools.chain(self.positions.get(input_word, ()), self.unbounded_positions):
+                bounds[position] = 1.01
+        else:
+            bounds = [1.01] * len(self.names)
+
+        input_counts = collections.Counter(lowered_input).items()
+        # sorted by ratio, then position, like a stable sort of all names by ratio
+        results: typing.List[typing.Tuple[float, int]] = []
+        for position in sorted(range(len(self.names)), key=bounds.__getitem__, reverse=True):
+            bound = bounds[position]
+            name = self.names[position]
+            if name == input_word:
+                ratio = 1.01
+            else:
+                lowered_name = name.lower()
+                max_length = max(input_length, len(name))
+                if len(results) >= limit:
+                    worst_ratio = -results[-1][0]
+                    if bound < worst_ratio:
+                        break
+                    if bound <= 1:
+                        # Tighter, but slower bound: each edit adds and/or removes one character, so the edit
+                        # distance is at least the number of characters of the longer word not in the other one.
+                        shared = sum(min(count, lowered_name.count(char)) for char, count in input_counts)
+                        if 1 - (max(lowered_input_length, len(lowered_name)) - shared) / max_length < worst_ratio:
+                            continue
+                ratio = 1 - jellyfish.damerau_levenshtein_distance(lowered_input, lowered_name) / max_length
+            bisect.insort(results, (-ratio, position))
+            if len(results) > limit:
+                results.pop()
+        return [(self.names[position], int(-ratio * 100)) for ratio, position in results]  # convert to int %
+
+
+def get_fuzzy_results(input_word: str, word_list: typing.Union[typing.Collection[str], FuzzyNameIndex],
+                      limit: typing.Optional[int] = None) -> typing.List[typing.Tuple[str, int]]:
+    # building the index takes longer than looking a name up in it, so callers that look up the same names repeatedly,
+    # like the server, keep a FuzzyNameIndex of them and pass that
+    index = word_list if isinstance(word_list, FuzzyNameIndex) else FuzzyNameIndex(word_list)
+    return index.get_results(input_word, limit)
+
+
+def get_intended_text(input_text: str, possible_answers: typing.Union[typing.Collection[str], FuzzyNameIndex]) \
+        -> typing.Tuple[str, bool, str]:
     picks = get_fuzzy_results(input_text, possible_answers, limit=2)
     if len(picks) > 1:
         dif = picks[0][1] - picks[1][1]
@@ -1176,3 +1367,158 @@ class DaemonThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
             t.start()
             self._threads.add(t)
             # NOTE: don't add to _threads_queues so we don't block on shutdown
+
+
+def get_peak_rss() -> typing.Optional[int]:
+    """Returns the peak resident set size of this process in bytes, or None if the platform doesn't report it."""
+    if is_windows:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if not kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS, but in kilobytes on other unix systems
+    return peak_rss if is_macos else peak_rss * 1024
+
+
+class GenerationProfiler:
+    """
+    Records the wall time, CPU time and peak memory of nested generation steps and counts calls of selected methods.
+    Written as a Chrome trace event file, which can be opened as a flame graph in e.g. Perfetto or speedscope.
+
+    A disabled profiler does nothing, so steps can be measured unconditionally.
+    """
+    enabled: bool
+    events: typing.List[typing.Dict[str, Any]]
+    counters: typing.Counter[str]
+    start: float
+    _restore: typing.List[typing.Tuple[type, str, Any, Any]]
+
+    class _Step:
+        __slots__ = ("profiler", "name", "category", "info", "start", "cpu_start", "peak_rss_start")
+
+        def __init__(self, profiler: GenerationProfiler, name: str, category: str, info: Dict[str, Any]) -> None:
+            self.profiler = profiler
+            self.name = name
+            self.category = category
+            self.info = info
+
+        def __enter__(self) -> None:
+            self.peak_rss_start = get_peak_rss()
+            self.cpu_start = time.thread_time()
+            self.start = time.perf_counter()
+
+        def __exit__(self, *exc_info: Any) -> None:
+            end = time.perf_counter()
+            cpu = time.thread_time() - self.cpu_start
+            peak_rss = get_peak_rss()
+            args = dict(self.info, cpu=round(cpu, 6), peak_rss=peak_rss)
+            if peak_rss is not None and self.peak_rss_start is not None:
+                args["peak_rss_growth"] = peak_rss - self.peak_rss_start
+            if exc_info[0] is not None:
+                args["error"] = exc_info[0].__name__
+            # list.append is thread-safe, so steps measured in output threads don't need a lock
+            self.profiler.events.append({
+                "name": self.name,
+                "cat": self.category,
+                "ph": "X",
+                "ts": round((self.start - self.profiler.start) * 1_000_000),
+                "dur": round((end - self.start) * 1_000_000),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.events = []
+        self.counters = collections.Counter()
+        self.start = time.perf_counter()
+        self._restore = []
+
+    def measure(self, name: str, category: str = "generation", **info: Any) -> typing.ContextManager[None]:
+        """
+        Returns a context manager that measures the code run in it as a step called name. Steps measured inside of it
+        on the same thread are nested below it.
+
+        :param name: name of the step, steps of the same name are grouped in a flame graph.
+        :param category: category of the step, to filter by in the trace viewer.
+        :param info: additional JSON serializable information to store with the step.
+        """
+        if not self.enabled:
+            return _null_context
+        return self._Step(self, name, category, info)
+
+    def count_calls(self, owner: type, method_name: str) -> None:
+        """
+        Counts the calls of a method of owner until the profiler is closed. Counting replaces the method on the class,
+        so it also counts calls for other multiworlds in this process, and may miss a few calls made concurrently.
+        """
+        if not self.enabled:
+            return
+        method = owner.__dict__[method_name]
+        counter_name = f"{owner.__name__}.{method_name}"
+        counters = self.counters
+
+        @functools.wraps(method)
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            counters[counter_name] += 1
+            return method(*args, **kwargs)
+
+        setattr(owner, method_name, counted)
+        self._restore.append((owner, method_name, method, counted))
+
+    def close(self) -> None:
+        """Stops counting method calls."""
+        while self._restore:
+            owner, method_name, method, counted = self._restore.pop()
+            # another profiler may have started counting in the meantime, in which case it has to restore the method
+            if owner.__dict__.get(method_name) is counted:
+                setattr(owner, method_name, method)
+
+    def get_totals(self, key: str) -> Dict[str, float]:
+        """Returns the total wall time in seconds of the steps with the argument key, for each of its values."""
+        totals: Dict[str, float] = collections.defaultdict(float)
+        for event in self.events:
+            value = event["args"].get(key)
+            if value is not None:
+                totals[str(value)] += event["dur"] / 1_000_000
+        return dict(sorted(totals.items(), key=lambda total: total[1], reverse=True))
+
+    def write(self, file_path: str) -> None:
+        """Stops counting method calls and writes the recorded steps and counters to file_path."""
+        self.close()
+        if not self.enabled:
+            return
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": sorted(self.events, key=lambda event: event["ts"]),
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "version": __version__,
+                    "wall": round(time.perf_counter() - self.start, 6),
+                    "peak_rss": get_peak_rss(),
+                    "counters": dict(self.counters),
+                    "games": self.get_totals("game"),
+                },
+            }, f)
+
+
+_null_context: typing.ContextManager[None] = contextlib.nullcontext()
@@ -209,7 +209,7 @@ def static_tracker_data(tracker: UUID) -> dict[str, Any]:
 
     return {
         "groups": groups,
-        "datapackage": tracker_data._multidata["datapackage"],
+        "datapackage": tracker_data.get_datapackage(),
         "player_locations_total": player_locations_total,
     }
 
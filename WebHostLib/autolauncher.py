@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import multiprocessing
@@ -47,11 +48,21 @@ def _mp_gen_game(
 
     setproctitle(f"Generator ({sid})")
     try:
-        return gen_game(gen_options, meta=meta, owner=owner, sid=sid, timeout=timeout)
+        # each job runs in a child of the generator, which is killed if the generation times out
+        return gen_game(gen_options, meta=meta, owner=owner, sid=sid, timeout=timeout, fork=True)
     finally:
         setproctitle(f"Generator (idle)")
 
 
+def get_generator_context() -> multiprocessing.context.BaseContext:
+    """Generators are forked from a server process that already imported the worlds, where supported."""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["worlds", "WebHostLib.autolauncher", "WebHostLib.generate"])
+    return context
+
+
 def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, timeout: int|None) -> None:
     try:
         meta = json.loads(generation.meta)
@@ -113,6 +124,56 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+class RoomSchedule:
+    """Keeps the deadline until which each room should be hosted, derived from its last activity and timeout."""
+    max_hosting_time = timedelta(days=3)
+    # rooms are refreshed from rows with a last activity since the last refresh, minus this margin for transactions
+    # that set their last activity before and committed after the last refresh.
+    refresh_margin = timedelta(seconds=10)
+
+    deadlines: dict[UUID, datetime]
+    queue: list[tuple[datetime, UUID]]
+    """heap of deadlines, entries are outdated if the deadline of their room changed since"""
+    refreshed: datetime | None
+
+    def __init__(self) -> None:
+        self.deadlines = {}
+        self.queue = []
+        self.refreshed = None
+
+    def get_changed_rooms(self, now: datetime) -> typing.Iterable[Room]:
+        """Selects the rooms with activity since the last refresh, or within the maximum hosting time on the first."""
+        since = self.refreshed - self.refresh_margin if self.refreshed else now - self.max_hosting_time
+        self.refreshed = now
+        return select(room for room in Room if room.last_activity >= since)
+
+    def update(self, room: Room, now: datetime) -> bool:
+        """Updates the deadline of a room, returns whether it should be hosted and its deadline changed."""
+        deadline = room.last_activity + min(timedelta(seconds=room.timeout + 5), self.max_hosting_time)
+        if deadline <= now:
+            self.deadlines.pop(room.id, None)
+            return False
+        if self.deadlines.get(room.id) == deadline:
+            return False
+        self.deadlines[room.id] = deadline
+        heapq.heappush(self.queue, (deadline, room.id))
+        return True
+
+    def expire(self, now: datetime) -> None:
+        """Removes the rooms past their deadline."""
+        while self.queue and self.queue[0][0] <= now:
+            deadline, room_id = heapq.heappop(self.queue)
+            if self.deadlines.get(room_id) == deadline:
+                del self.deadlines[room_id]
+
+    def discard(self, room_id: UUID) -> None:
+        """Forgets the deadline of a room, so the next update of it counts as changed."""
+        self.deadlines.pop(room_id, None)
+
+    def __contains__(self, room_id: UUID) -> bool:
+        return room_id in self.deadlines
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -125,15 +186,23 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
+                schedule = RoomSchedule()
                 while not stop_event.wait(0.1):
                     with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
+                        now = datetime.utcnow()
+                        schedule.expire(now)
+                        for room in schedule.get_changed_rooms(now):
+                            if schedule.update(room, now):
                                 hosters[room.id.int % len(hosters)].start_room(room.id)
+                        # a room that shut down before its deadline may have been active during its shutdown,
+                        # or set its last activity to the past, so look at its row again
+                        for hoster in hosters:
+                            for room_id in hoster.collect_shut_down_rooms():
+                                if room_id in schedule:
+                                    room = Room.get(id=room_id)
+                                    schedule.discard(room_id)
+                                    if room and schedule.update(room, now):
+                                        hoster.start_room(room_id)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -147,8 +216,8 @@ def autogen(config: dict):
         try:
             with Locker("autogen"):
 
-                with multiprocessing.Pool(config["GENERATORS"], initializer=init_generator,
-                                          initargs=(config,), maxtasksperchild=10) as generator_pool:
+                with get_generator_context().Pool(config["GENERATORS"], initializer=init_generator,
+                                                  initargs=(config,), maxtasksperchild=10) as generator_pool:
                     job_time = config["JOB_TIME"]
                     with db_session:
                         to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
@@ -203,9 +272,16 @@ class MultiworldInstance():
         process.start()
         self.process = process
 
-    def start_room(self, room_id):
+    def collect_shut_down_rooms(self) -> list[UUID]:
+        """Returns the rooms that shut down since the last call, which can be started again."""
+        shut_down_rooms = []
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_ids.remove(room_id)
+            shut_down_rooms.append(room_id)
+        return shut_down_rooms
+
+    def start_room(self, room_id):
         if room_id in self.room_ids:
             pass  # should already be hosted currently.
         else:
@@ -60,6 +60,60 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class DBCommandPoller:
+    """Polls the commands of all rooms hosted by this process together, and runs them in the loop of their room."""
+    interval: float = 5
+    # number of rooms per query, to stay below the number of parameters databases allow in a query
+    rooms_per_query: int = 500
+
+    processors: typing.Dict[typing.Any, DBCommandProcessor]
+    lock: threading.Lock
+    thread: typing.Optional[threading.Thread]
+
+    def __init__(self) -> None:
+        self.processors = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, ctx: WebHostContext) -> None:
+        """Polls the commands of the room of ctx, until its exit_event is set."""
+        with self.lock:
+            self.processors[ctx.room_id] = DBCommandProcessor(ctx)
+            if not self.thread:
+                self.thread = threading.Thread(target=self.run, name="DBCommandPoller", daemon=True)
+                self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logging.exception(e)
+            time.sleep(self.interval)
+
+    def poll(self) -> None:
+        with self.lock:
+            for room_id, processor in list(self.processors.items()):
+                if processor.ctx.exit_event.is_set():
+                    del self.processors[room_id]
+            processors = self.processors.copy()
+        if not processors:
+            return
+        room_ids = list(processors)
+        with db_session:
+            for start in range(0, len(room_ids), self.rooms_per_query):
+                query_room_ids = room_ids[start:start + self.rooms_per_query]
+                commands = select(command for command in Command if command.room.id in query_room_ids)
+                for command in commands:
+                    processor = processors[command.room.id]
+                    processor.ctx.main_loop.call_soon_threadsafe(processor, command.commandtext)
+                    command.delete()
+            commit()
+
+
+command_poller = DBCommandPoller()
+
+
 class WebHostContext(Context):
     room_id: int
 
@@ -89,20 +143,6 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            del commands
-            time.sleep(5)
-
     @db_session
     def load(self, room_id: int):
         self.room_id = room_id
@@ -158,7 +198,7 @@ class WebHostContext(Context):
                 if savegame_data:
                     self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
+        command_poller.add(self)
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
@@ -204,6 +244,8 @@ def get_static_server_data() -> dict:
             world_name: world.location_name_groups
             for world_name, world in worlds.AutoWorldRegister.world_types.items()
         },
+        # filled by the rooms of a process, so each data package is only encoded once per process
+        "encoded_game_data": {},
     }
 
     return data
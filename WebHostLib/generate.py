@@ -2,11 +2,15 @@ import concurrent.futures
 import json
 import os
 import random
+import pickle
+import select
+import signal
 import tempfile
+import time
 import zipfile
 from collections import Counter
 from pickle import PicklingError
-from typing import Any
+from typing import Any, Callable
 
 from flask import flash, redirect, render_template, request, session, url_for
 from pony.orm import commit, db_session
@@ -18,7 +22,7 @@ from Utils import __version__, restricted_dumps, DaemonThreadPoolExecutor
 from WebHostLib import app
 from settings import ServerOptions, GeneratorOptions
 from .check import get_yaml_data, roll_options
-from .models import Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID
+from .models import db, Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID
 from .upload import upload_zip_to_db
 
 
@@ -118,7 +122,55 @@ def start_generation(options: dict[str, dict | str], meta: dict[str, Any]):
         return redirect(url_for("view_seed", seed=seed_id))
 
 
-def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None, sid=None, timeout: int|None = None):
+def run_in_child(task: Callable[[], Any], timeout: float) -> Any:
+    """Runs task in a forked child process, which is killed after timeout seconds. Only available where os.fork is."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            try:
+                outcome = (True, task())
+            except BaseException as e:
+                outcome = (False, e)
+            try:
+                data = pickle.dumps(outcome)
+            except Exception as e:
+                error = e if outcome[0] else outcome[1]
+                data = pickle.dumps((False, RuntimeError(format_exception(error))))
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(data)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    deadline = time.monotonic() + timeout
+    chunks: list[bytes] = []
+    try:
+        with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([pipe], [], [], remaining)[0]:
+                    raise concurrent.futures.TimeoutError(f"Generation exceeded {timeout} seconds.")
+                chunk = pipe.read(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except BaseException:
+        os.kill(pid, signal.SIGKILL)
+        raise
+    finally:
+        _, status = os.waitpid(pid, 0)
+    if not chunks:
+        raise RuntimeError(f"Generation process exited without a result, with status {status}.")
+    ok, result = pickle.loads(b"".join(chunks))
+    if not ok:
+        raise result
+    return result
+
+
+def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None, sid=None, timeout: int|None = None,
+             fork: bool = False):
     if meta is None:
         meta = {}
 
@@ -173,11 +225,15 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
 
         return upload_to_db(target.name, sid, owner, race)
 
-    thread_pool = DaemonThreadPoolExecutor(max_workers=1)
-    thread = thread_pool.submit(task)
-
+    thread_pool: DaemonThreadPoolExecutor | None = None
     try:
-        return thread.result(timeout)
+        if timeout and fork and hasattr(os, "fork"):
+            # a generation that takes too long is stopped with the process running it, along with all its state.
+            # the child opens its own database connection.
+            db.disconnect()
+            return run_in_child(task, timeout)
+        thread_pool = DaemonThreadPoolExecutor(max_workers=1)
+        return thread_pool.submit(task).result(timeout)
     except concurrent.futures.TimeoutError as e:
         if sid:
             with db_session:
@@ -190,6 +246,7 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
                                      format_exception(e))
                     gen.meta = json.dumps(meta)
                     commit()
+        raise
     except (KeyboardInterrupt, SystemExit):
         # don't update db, retry next time
         raise
@@ -205,10 +262,10 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
                     commit()
         raise
     finally:
-        # free resources claimed by thread pool, if possible
-        # NOTE: Timeout depends on the process being killed at some point
-        #       since we can't actually cancel a running gen at the moment.
-        thread_pool.shutdown(wait=False, cancel_futures=True)
+        if thread_pool:
+            # free resources claimed by thread pool, if possible
+            # NOTE: a gen that timed out in a thread can't be cancelled, it keeps running until it finishes.
+            thread_pool.shutdown(wait=False, cancel_futures=True)
 
 
 @app.route('/wait/<suuid:seed>')
@@ -37,6 +37,7 @@ class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     rooms = Set(Room)
     multidata = Required(bytes, lazy=True)
+    tracker_projection = Optional('SeedTrackerProjection', cascade_delete=True)
     owner = Required(UUID, index=True)
     creation_time = Required(datetime, default=lambda: datetime.utcnow(), index=True)  # index used by landing page
     slots = Set(Slot)
@@ -44,6 +45,13 @@ class Seed(db.Entity):
     meta = Required(LongStr, default=lambda: "{\"race\": false}")  # additional meta information/tags
 
 
+class SeedTrackerProjection(db.Entity):
+    # what trackers use of a seed, see WebHostLib.tracker.make_tracker_projection
+    # kept out of Seed, so existing databases get it as a new table
+    seed = PrimaryKey(Seed)
+    data = Required(bytes, lazy=True)
+
+
 class Command(db.Entity):
     id = PrimaryKey(int, auto=True)
     room = Required(Room)
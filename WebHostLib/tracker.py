@@ -1,5 +1,8 @@
 import datetime
 import collections
+import functools
+import pickle
+import zlib
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
@@ -9,13 +12,18 @@ from flask import make_response, render_template, request, Request, Response
 from werkzeug.exceptions import abort
 
 from MultiServer import Context, get_saving_second
-from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
+from NetUtils import CheckedLocations, ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
+# Number of decoded seeds and data packages kept per process, shared by all trackers.
+TRACKER_MULTIDATA_CACHE_SIZE = 16
+TRACKER_GAME_NAMES_CACHE_SIZE = 256
+# Version of the tracker projection stored with seeds, projections of other versions are ignored.
+TRACKER_PROJECTION_VERSION = 1
 
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
@@ -40,6 +48,79 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+class GameNames(NamedTuple):
+    """Lookup tables of a game's data package."""
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+@functools.lru_cache(maxsize=TRACKER_MULTIDATA_CACHE_SIZE)
+def _get_multidata(seed_id: UUID) -> Dict[str, Any]:
+    """Decodes the multidata of a seed. Seeds don't change, so the result is shared and must not be modified."""
+    return Context.decompress(Seed[seed_id].multidata)
+
+
+def make_tracker_projection(multidata: Dict[str, Any]) -> bytes:
+    """Stores the parts of the multidata that trackers use, with each slot's locations as columns.
+    Created when a seed is uploaded, so trackers don't need to load and decode the full multidata."""
+    locations = {}
+    for player, player_locations in multidata["locations"].items():
+        location_ids = tuple(sorted(player_locations))
+        items = [player_locations[location_id] for location_id in location_ids]
+        locations[player] = (location_ids, tuple(item_id for item_id, _, _ in items),
+                             tuple(receiving_player for _, receiving_player, _ in items),
+                             tuple(item_flags for _, _, item_flags in items))
+    return zlib.compress(pickle.dumps({
+        "version": TRACKER_PROJECTION_VERSION,
+        "seed_name": multidata["seed_name"],
+        "slot_info": multidata["slot_info"],
+        "datapackage": multidata["datapackage"],
+        "locations": locations,
+        "precollected_items": multidata["precollected_items"],
+        "spheres": multidata.get("spheres", []),
+    }), 9)
+
+
+def load_tracker_projection(data: bytes) -> Optional[Dict[str, Any]]:
+    """Loads a tracker projection into the same shape as the multidata, or None if it's from another version."""
+    projection = restricted_loads(zlib.decompress(data))
+    if projection.pop("version", None) != TRACKER_PROJECTION_VERSION:
+        return None
+    projection["locations"] = {
+        player: dict(zip(location_ids, zip(item_ids, receiving_players, item_flags)))
+        for player, (location_ids, item_ids, receiving_players, item_flags) in projection["locations"].items()
+    }
+    return projection
+
+
+@functools.lru_cache(maxsize=TRACKER_MULTIDATA_CACHE_SIZE)
+def _get_seed_data(seed_id: UUID) -> Dict[str, Any]:
+    """Loads what trackers need from a seed, from its tracker projection if it has one, otherwise from its multidata.
+    The result is shared and must not be modified."""
+    seed = Seed[seed_id]
+    if seed.tracker_projection:
+        projection = load_tracker_projection(seed.tracker_projection.data)
+        if projection:
+            return projection
+    return _get_multidata(seed_id)
+
+
+@functools.lru_cache(maxsize=TRACKER_GAME_NAMES_CACHE_SIZE)
+def _get_game_names(checksum: str) -> GameNames:
+    """Builds the lookup tables of a data package. The result is shared and must not be modified."""
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return GameNames(
+        KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
+            id: name for name, id in game_package["item_name_to_id"].items()}),
+        KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
+            id: name for name, id in game_package["location_name_to_id"].items()}),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -48,14 +129,15 @@ class TrackerData:
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
     """
     room: Room
-    _multidata: Dict[str, Any]
+    _seed_data: Dict[str, Any]
     _multisave: Dict[str, Any]
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
+        self._seed_id = room.seed.id
+        self._seed_data = _get_seed_data(self._seed_id)
         self._multisave = restricted_loads(room.multisave) if room.multisave else {}
         self._tracker_cache = {}
 
@@ -69,20 +151,27 @@ class TrackerData:
         self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
-        for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+        for game, game_package in self._seed_data["datapackage"].items():
+            game_names = _get_game_names(game_package["checksum"])
+            self.item_id_to_name[game] = game_names.item_id_to_name
+            self.location_id_to_name[game] = game_names.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = game_names.item_name_to_id
+            self.location_name_to_id[game] = game_names.location_name_to_id
+
+    @property
+    def _multidata(self) -> Dict[str, Any]:
+        """The full multidata, only loaded for data that isn't in the tracker projection."""
+        return _get_multidata(self._seed_id)
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
-        return self._multidata["seed_name"]
+        return self._seed_data["seed_name"]
+
+    def get_datapackage(self) -> Dict[str, Dict[str, Any]]:
+        """Retrieves the version and checksum of the data package of each game."""
+        return self._seed_data["datapackage"]
 
     def get_slot_data(self, player: int) -> Dict[str, Any]:
         """Retrieves the slot data for a given player."""
@@ -90,7 +179,7 @@ class TrackerData:
 
     def get_slot_info(self, player: int) -> NetworkSlot:
         """Retrieves the NetworkSlot data for a given player."""
-        return self._multidata["slot_info"][player]
+        return self._seed_data["slot_info"][player]
 
     def get_player_name(self, player: int) -> str:
         """Retrieves the slot name for a given player."""
@@ -102,15 +191,20 @@ class TrackerData:
 
     def get_player_locations(self, player: int) -> Dict[int, ItemMetadata]:
         """Retrieves all locations with their containing item's metadata for a given player."""
-        return self._multidata["locations"][player]
+        return self._seed_data["locations"][player]
 
     def get_player_starting_inventory(self, player: int) -> List[int]:
         """Retrieves a list of all item codes a given slot starts with."""
-        return self._multidata["precollected_items"][player]
+        return self._seed_data["precollected_items"][player]
 
+    @_cache_results
     def get_player_checked_locations(self, team: int, player: int) -> Set[int]:
         """Retrieves the set of all locations marked complete by this player."""
-        return self._multisave.get("location_checks", {}).get((team, player), set())
+        checked = self._multisave.get("location_checks", {}).get((team, player), set())
+        if isinstance(checked, int):
+            # saves since version 3 store a bitmap over the player's sorted locations
+            checked = set(CheckedLocations(sorted(self.get_player_locations(player)), checked))
+        return checked
 
     @_cache_results
     def get_player_missing_locations(self, team: int, player: int) -> Set[int]:
@@ -197,7 +291,7 @@ class TrackerData:
         """Retrieves a dictionary of all players ids on each team."""
         return {
             0: [
-                player for player, slot_info in self._multidata["slot_info"].items()
+                player for player, slot_info in self._seed_data["slot_info"].items()
             ]
         }
 
@@ -208,7 +302,7 @@ class TrackerData:
         """Retrieves a dictionary of all player slot-type players ids on each team."""
         return {
             0: [
-                player for player, slot_info in self._multidata["slot_info"].items()
+                player for player, slot_info in self._seed_data["slot_info"].items()
                 if self.get_slot_info(player).type == SlotType.player
             ]
         }
@@ -294,7 +388,7 @@ class TrackerData:
     @_cache_results
     def get_spheres(self) -> List[List[int]]:
         """ each sphere is { player: { location_id, ... } } """
-        return self._multidata.get("spheres", [])
+        return self._seed_data.get("spheres", [])
 
 
 def _process_if_request_valid(incoming_request: Request, room: Optional[Room]) -> Optional[Response]:
@@ -18,7 +18,8 @@ from Utils import VersionException, __version__
 from worlds.Files import AutoPatchRegister
 from worlds.AutoWorld import data_package_checksum
 from . import app
-from .models import Seed, Room, Slot, GameDataPackage
+from .models import Seed, SeedTrackerProjection, Room, Slot, GameDataPackage
+from .tracker import make_tracker_projection
 
 banned_extensions = (".sfc", ".z64", ".n64", ".nes", ".smc", ".sms", ".gb", ".gbc", ".gba")
 allowed_options_extensions = (".yaml", ".json", ".yml", ".txt", ".zip")
@@ -91,7 +92,7 @@ def process_multidata(compressed_multidata, files={}):
         flush()  # commit slots
 
     compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
-    return slots, compressed_multidata
+    return slots, compressed_multidata, make_tracker_projection(decompressed_multidata)
 
 
 def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None):
@@ -156,10 +157,11 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
 
     # Load multi data.
     if multidata:
-        slots, multidata = process_multidata(multidata, files)
+        slots, multidata, tracker_projection = process_multidata(multidata, files)
 
         seed = Seed(multidata=multidata, spoiler=spoiler, slots=slots, owner=owner, meta=json.dumps(meta),
                     id=sid if sid else uuid.uuid4())
+        SeedTrackerProjection(seed=seed, data=tracker_projection)
         flush()  # create seed
         for slot in slots:
             slot.seed = seed
@@ -198,11 +200,12 @@ def uploads():
                     # noinspection PyBroadException
                     try:
                         multidata = uploaded_file.read()
-                        slots, multidata = process_multidata(multidata)
+                        slots, multidata, tracker_projection = process_multidata(multidata)
                     except Exception as e:
                         flash(f"Could not load multidata. File may be corrupted or incompatible. ({e})")
                     else:
                         seed = Seed(multidata=multidata, slots=slots, owner=session["_id"])
+                        SeedTrackerProjection(seed=seed, data=tracker_projection)
                         flush()  # place into DB and generate ids
                         return redirect(url_for("view_seed", seed=seed.id))
             else:
@@ -1,6 +1,5 @@
 #cython: language_level=3
 #distutils: language = c
-#distutils: depends = intset.h
 
 """
 Provides faster implementation of some core parts.
@@ -14,6 +13,7 @@ from cpython cimport PyObject
 from typing import Any, Dict, Iterable, Iterator, Generator, Sequence, Tuple, TypeVar, Union, Set, List, TYPE_CHECKING
 from cymem.cymem cimport Pool
 from libc.stdint cimport int64_t, uint32_t
+from libc.stdlib cimport qsort
 from collections import defaultdict
 
 cdef extern from *:
@@ -31,28 +31,6 @@ ctypedef int64_t ap_id_t
 cdef ap_player_t MAX_PLAYER_ID = 1000000  # limit the size of indexing array
 cdef size_t INVALID_SIZE = <size_t>(-1)  # this is all 0xff... adding 1 results in 0, but it's not negative
 
-# configure INTSET for player
-cdef extern from *:
-    """
-    #define INTSET_NAME ap_player_set
-    #define INTSET_TYPE uint32_t  // has to match ap_player_t
-    """
-
-# create INTSET for player
-cdef extern from "intset.h":
-    """
-    #undef INTSET_NAME
-    #undef INTSET_TYPE
-    """
-    ctypedef struct ap_player_set:
-        pass
-
-    ap_player_set* ap_player_set_new(size_t bucket_count) nogil
-    void ap_player_set_free(ap_player_set* set) nogil
-    bint ap_player_set_add(ap_player_set* set, ap_player_t val) nogil
-    bint ap_player_set_contains(ap_player_set* set, ap_player_t val) nogil
-
-
 cdef struct LocationEntry:
     # layout is so that
     # 64bit player: location+sender and item+receiver 128bit comparisons, if supported
@@ -69,6 +47,22 @@ cdef struct IndexEntry:
     size_t count
 
 
+cdef LocationEntry* _sorted_entries  # qsort has no context argument, only set while holding the GIL
+
+
+cdef int _compare_receiver_item(const void* a, const void* b) noexcept nogil:
+    # sort entry indices by receiver and item, keeping the order of entries with the same receiver and item
+    cdef size_t index_a = (<const size_t*>a)[0]
+    cdef size_t index_b = (<const size_t*>b)[0]
+    cdef LocationEntry* entry_a = _sorted_entries + index_a
+    cdef LocationEntry* entry_b = _sorted_entries + index_b
+    if entry_a.receiver != entry_b.receiver:
+        return -1 if entry_a.receiver < entry_b.receiver else 1
+    if entry_a.item != entry_b.item:
+        return -1 if entry_a.item < entry_b.item else 1
+    return -1 if index_a < index_b else (1 if index_a > index_b else 0)
+
+
 if TYPE_CHECKING:
     State = Dict[Tuple[int, int], Set[int]]
 else:
@@ -96,6 +90,10 @@ cdef class LocationStore:
     cdef list _items  # ~64KB/1000 players, speed up items (56 per tuple + 8 per list entry)
     cdef list _proxies  # ~92KB/1000 players, speed up self[player] (56 per struct + 28 per len + 8 per list entry)
     cdef PyObject** _raw_proxies  # 8K/1000 players, faster access to _proxies, but does not keep a ref
+    # built on first find_item or get_for_player, so rooms that never hint or collect don't pay for it
+    cdef size_t* receiver_order  # 800KB/100k items, entry indices sorted by receiver and item
+    cdef IndexEntry* receiver_index  # 16KB/1000 players, range of receiver_order per receiver
+    cdef size_t receiver_index_size
 
     def get_size(self):
         from sys import getsizeof
@@ -106,6 +104,8 @@ cdef class LocationStore:
         size += sum(sizeof(item) for item in self._items)
         size += sum(sizeof(proxy) for proxy in self._proxies)
         size += sizeof(self._raw_proxies[0]) * self.sender_index_size
+        if self.receiver_index:
+            size += sizeof(size_t) * self.entry_count + sizeof(IndexEntry) * self.receiver_index_size
         return size
 
     def __init__(self, locations_dict: Dict[int, Dict[int, Sequence[int]]]) -> None:
@@ -215,48 +215,92 @@ cdef class LocationStore:
         return self._items
 
     # specialized accessors
+    cdef void _build_receiver_index(self) except *:
+        global _sorted_entries
+        cdef size_t i
+        cdef ap_player_t receiver
+        cdef size_t max_receiver = 0
+        for i in range(self.entry_count):
+            max_receiver = max(max_receiver, self.entries[i].receiver)
+
+        cdef size_t* order = NULL
+        if self.entry_count:
+            order = <size_t*>self._mem.alloc(self.entry_count, sizeof(size_t))
+            for i in range(self.entry_count):
+                order[i] = i
+            _sorted_entries = self.entries
+            qsort(order, self.entry_count, sizeof(size_t), _compare_receiver_item)
+            _sorted_entries = NULL
+
+        # ranges of receivers without items stay at count 0 from alloc
+        cdef IndexEntry* index = <IndexEntry*>self._mem.alloc(max_receiver + 1, sizeof(IndexEntry))
+        for i in range(self.entry_count):
+            receiver = self.entries[order[i]].receiver
+            if not index[receiver].count:
+                index[receiver].start = i
+            index[receiver].count += 1
+
+        self.receiver_order = order
+        self.receiver_index_size = max_receiver + 1
+        self.receiver_index = index
+
+    cdef size_t _find_receiver_item(self, ap_player_t receiver, ap_id_t item) nogil:
+        # binary search for the first position of item in the range of receiver in receiver_order
+        cdef size_t l = self.receiver_index[receiver].start
+        cdef size_t r = l + self.receiver_index[receiver].count
+        cdef size_t m
+        while l < r:
+            m = (l + r) // 2
+            if self.entries[self.receiver_order[m]].item < item:
+                l = m + 1
+            else:
+                r = m
+        return l
+
     def find_item(self, slots: Set[int], seeked_item_id: int) -> Generator[Tuple[int, int, int, int, int], None, None]:
         cdef ap_id_t item = seeked_item_id
         cdef ap_player_t receiver
-        cdef ap_player_set* receivers
-        cdef size_t slot_count = len(slots)
-        if slot_count == 1:
-            # specialized implementation for single slot
-            receiver = list(slots)[0]
-            with nogil:
-                for entry in self.entries[:self.entry_count]:
-                    if entry.item == item and entry.receiver == receiver:
-                        with gil:
-                            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-        elif slot_count:
-            # generic implementation with lookup in set
-            receivers = ap_player_set_new(min(1023, slot_count))  # limit top level struct to 16KB
-            if not receivers:
-                raise MemoryError()
-            try:
-                for receiver in slots:
-                    if not ap_player_set_add(receivers, receiver):
-                        raise MemoryError()
-                with nogil:
-                    for entry in self.entries[:self.entry_count]:
-                        if entry.item == item and ap_player_set_contains(receivers, entry.receiver):
-                            with gil:
-                                yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-            finally:
-                ap_player_set_free(receivers)
+        cdef size_t i
+        cdef size_t end
+        cdef LocationEntry* entry
+        if not self.receiver_index:
+            self._build_receiver_index()
+        cdef list found = []
+        for slot in slots:
+            if slot < 1 or slot >= self.receiver_index_size:
+                continue
+            receiver = slot
+            end = self.receiver_index[receiver].start + self.receiver_index[receiver].count
+            i = self._find_receiver_item(receiver, item)
+            while i < end and self.entries[self.receiver_order[i]].item == item:
+                found.append(self.receiver_order[i])
+                i += 1
+        if len(slots) > 1:
+            # yield in the order of entries, same as for a single slot
+            found.sort()
+        for i in found:
+            entry = self.entries + i
+            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
 
     def get_for_player(self, slot: int) -> Dict[int, Set[int]]:
-        cdef ap_player_t receiver = slot
+        cdef ap_player_t receiver
+        cdef size_t i
+        cdef LocationEntry* entry
         all_locations: Dict[int, Set[int]] = {}
-        with nogil:
-            for entry in self.entries[:self.entry_count]:
-                if entry.receiver == receiver:
-                    with gil:
-                        sender: int = entry.sender
-                        if sender not in all_locations:
-                            all_locations[sender] = set()
-                        all_locations[sender].add(entry.location)
-        return all_locations
+        if not self.receiver_index:
+            self._build_receiver_index()
+        if slot < 1 or slot >= self.receiver_index_size:
+            return all_locations
+        receiver = slot
+        cdef size_t start = self.receiver_index[receiver].start
+        for i in range(start, start + self.receiver_index[receiver].count):
+            entry = self.entries + self.receiver_order[i]
+            sender: int = entry.sender
+            if sender not in all_locations:
+                all_locations[sender] = set()
+            all_locations[sender].add(entry.location)
+        # keep senders in order, same as the entries
+        return {sender: all_locations[sender] for sender in sorted(all_locations)}
 
     def get_checked(self, state: State, team: int, slot: int) -> List[int]:
         cdef ap_player_t sender = slot
@@ -213,6 +213,7 @@ class ERPlacementState:
         source_exit.connect(target_region)
 
         self.collection_state.stale[self.world.player] = True
+        self.collection_state.stale_connections[self.world.player] = None
         self.placements.append(source_exit)
         self.pairings.append((source_exit.name, target_entrance.name))
         self.entrance_lookup.remove(target_entrance)
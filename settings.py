@@ -590,6 +590,12 @@ class ServerOptions(Group):
         "auto" -> !countdown will be available for any room with less than 30 slots.
         """
 
+    class SaveJournal(Bool):
+        """
+        Append the changes since the last save to a journal next to the save file, instead of rewriting the whole save.
+        The save file is only rewritten once the journal grows larger than it.
+        """
+
     class AutoShutdown(int):
         """Automatically shut down the server after this many seconds without new location checks, 0 to keep running"""
 
@@ -615,6 +621,7 @@ class ServerOptions(Group):
     multidata: str | None = None
     savefile: str | None = None
     disable_save: bool = False
+    save_journal: SaveJournal | bool = False
     loglevel: str = "info"
     logtime: bool = False
     server_password: ServerPassword | None = None
@@ -679,6 +686,18 @@ class GeneratorOptions(Group):
         OFF = 0
         ON = 1
 
+    class SweepThreads(int):
+        """
+        Number of threads used to check the reachability of different players' locations concurrently during sweeps.
+        Only has an effect on free-threaded Python builds. 1 sweeps in a single thread.
+        """
+
+    class PlaythroughTimeLimit(int):
+        """
+        Seconds the spoiler playthrough may spend removing items that aren't required to beat the game.
+        Items not checked by then are kept in the playthrough. 0 for no limit.
+        """
+
     class PanicMethod(str):
         """
         What to do if the current item placements appear unsolvable.
@@ -696,6 +715,8 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    sweep_threads: SweepThreads = SweepThreads(1)
+    playthrough_time_limit: PlaythroughTimeLimit = PlaythroughTimeLimit(0)
     loglevel: str = "info"
     logtime: bool = False
 
@@ -0,0 +1,81 @@
+"""
+Benchmark of hint and collect lookups in a large room, comparing the receiver index of LocationStore with scanning all
+locations from python, for both the _speedups and the pure python implementation.
+"""
+
+import random
+import typing
+from timeit import timeit
+
+Locations = typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
+
+
+def make_locations(players: int, locations_per_player: int, seed: int = 0) -> Locations:
+    rng = random.Random(seed)
+    return {
+        player: {
+            location_id: (rng.randrange(locations_per_player), rng.randrange(1, players + 1), rng.randrange(8))
+            for location_id in range(locations_per_player)
+        }
+        for player in range(1, players + 1)
+    }
+
+
+def scan_find_item(store: typing.Any, slots: typing.Set[int], seeked_item_id: int
+                   ) -> typing.List[typing.Tuple[int, int, int, int, int]]:
+    """Finds items by scanning all locations, the way find_item worked before the receiver index."""
+    return [(finding_player, location_id, item_id, receiving_player, item_flags)
+            for finding_player, check_data in store.items()
+            for location_id, (item_id, receiving_player, item_flags) in check_data.items()
+            if receiving_player in slots and item_id == seeked_item_id]
+
+
+def scan_get_for_player(store: typing.Any, slot: int) -> typing.Dict[int, typing.Set[int]]:
+    """Finds the locations of a player's items by scanning all locations, the way get_for_player worked before."""
+    all_locations: typing.Dict[int, typing.Set[int]] = {}
+    for source_slot, location_data in store.items():
+        for location_id, values in location_data.items():
+            if values[1] == slot:
+                all_locations.setdefault(source_slot, set()).add(location_id)
+    return all_locations
+
+
+def run_location_store_benchmark(players: int = 1000, locations_per_player: int = 100, lookups: int = 100) -> None:
+    from NetUtils import LocationStore, _LocationStore
+
+    locations = make_locations(players, locations_per_player)
+    rng = random.Random(1)
+    hints = [({rng.randrange(1, players + 1)}, rng.randrange(locations_per_player)) for _ in range(lookups)]
+    collects = [rng.randrange(1, players + 1) for _ in range(lookups)]
+
+    store_types: typing.List[typing.Tuple[str, typing.Callable[[Locations], typing.Any]]] = [
+        ("pure python", _LocationStore)]
+    if LocationStore is not _LocationStore:
+        store_types.insert(0, ("_speedups", LocationStore))
+    else:
+        print("_speedups not available, only benchmarking the pure python LocationStore.")
+
+    print(f"{players} players with {locations_per_player} locations each, {lookups} lookups per run")
+    for name, store_type in store_types:
+        store = store_type(locations)
+        for slots, item_id in hints:
+            assert sorted(store.find_item(slots, item_id)) == sorted(scan_find_item(store, slots, item_id))
+        store = store_type(locations)
+
+        build = timeit(lambda: list(store.find_item(*hints[0])), number=1)
+        indexed_hints = timeit(lambda: [list(store.find_item(slots, item_id)) for slots, item_id in hints], number=1)
+        indexed_collects = timeit(lambda: [store.get_for_player(slot) for slot in collects], number=1)
+        scanned_hints = timeit(lambda: [scan_find_item(store, slots, item_id) for slots, item_id in hints], number=1)
+        scanned_collects = timeit(lambda: [scan_get_for_player(store, slot) for slot in collects], number=1)
+
+        print(f"{name}: first lookup, building the index: {build * 1000:.3f} ms")
+        print(f"{name}: find_item       indexed {indexed_hints / lookups * 1000:.4f} ms, "
+              f"scanned {scanned_hints / lookups * 1000:.4f} ms")
+        print(f"{name}: get_for_player  indexed {indexed_collects / lookups * 1000:.4f} ms, "
+              f"scanned {scanned_collects / lookups * 1000:.4f} ms")
+
+
+if __name__ == "__main__":
+    import path_change
+    path_change.change_home()
+    run_location_store_benchmark()
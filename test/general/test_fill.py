@@ -1,11 +1,13 @@
+import typing
 from typing import List, Iterable
 import unittest
+import unittest.mock
 
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
-from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
+from Fill import FillError, LocationIndex, balance_multiworld_progression, fill_restrictive, \
     distribute_early_items, distribute_items_restrictive
-from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
+from BaseClasses import CollectionState, Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
 
@@ -463,6 +465,64 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(1, len(player1.prog_items))
         self.assertIsNot(loc0.item, player1.prog_items[0], "Filled item was still present in item pool")
 
+    def test_unplaced_items_stay_collected(self):
+        """Test that items that could not be placed are still assumed collected when placing the remaining items"""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+
+        item0 = player1.prog_items[0]
+        item1 = player1.prog_items[1]
+        loc0 = player1.locations[0]
+        loc1 = player1.locations[1]
+
+        add_item_rule(loc0, lambda item: False)
+        add_item_rule(loc1, lambda item: item is not item0)
+        set_rule(loc1, lambda state: state.has(item0.name, player1.id))
+        # item0 is placed first and can't go anywhere
+        item_pool = [item1, item0]
+        fill_restrictive(multiworld, multiworld.state, player1.locations.copy(), item_pool, allow_partial=True)
+
+        self.assertIsNone(loc0.item)
+        self.assertEqual(loc1.item, item1)
+        self.assertEqual(item_pool, [item0])
+
+
+class TestLocationIndex(unittest.TestCase):
+    def test_candidates_keep_order(self):
+        """Tests that `LocationIndex` skips locations that can't hold an item, keeping the order of the rest"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 8, 2)
+        player2 = generate_player_data(multiworld, 2, 8)
+        for location in player1.locations[:4]:
+            location.progress_type = LocationProgressType.EXCLUDED
+        for location in player2.locations[::2]:
+            add_item_rule(location, lambda item: item.player != 1)
+        locations = [location for pair in zip(player1.locations, player2.locations) for location in pair]
+        index = LocationIndex(locations)
+
+        expected = [location for location in locations
+                    if location.can_fill(multiworld.state, player1.prog_items[0], False)]
+        self.assertEqual(len(expected), 8)
+        self.assertEqual(list(index.candidates(player1.prog_items[0], False)), expected)
+        self.assertEqual(list(index.candidates(player1.prog_items[0], True)), player1.locations[4:])
+
+    def test_fill_with_index(self):
+        """Tests that `fill_restrictive` places the same items with a location index as without"""
+        def fill() -> List[typing.Optional[Item]]:
+            multiworld = generate_test_multiworld()
+            player1 = generate_player_data(multiworld, 1, 16, 6, 6)
+            for location in player1.locations[:8]:
+                location.progress_type = LocationProgressType.EXCLUDED
+            set_rule(player1.locations[12], lambda state: state.has(player1.prog_items[0].name, 1))
+            fill_restrictive(multiworld, multiworld.state, player1.locations.copy(),
+                             player1.prog_items + player1.basic_items)
+            return [location.item for location in player1.locations]
+
+        with_index = fill()
+        with unittest.mock.patch.object(LocationIndex, "effective", False):
+            without_index = fill()
+        self.assertEqual([item and item.name for item in with_index], [item and item.name for item in without_index])
+
 
 class TestDistributeItemsRestrictive(unittest.TestCase):
     def test_basic_distribute(self):
@@ -880,3 +940,48 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
 
         self.assertRegionContains(
             self.player1.regions[2], self.player2.prog_items[0])
+
+    def test_same_swaps_as_recollecting(self) -> None:
+        """Test that balancing swaps the same items as when each candidate is tested with a freshly collected state"""
+        def find_items_to_replace_by_recollecting(state: CollectionState, items_to_test: List[Location],
+                                                  locations_to_test: typing.Set[Location],
+                                                  needs_replacement: typing.Callable[[CollectionState], bool]
+                                                  ) -> List[Location]:
+            items_to_replace: List[Location] = []
+            items_to_test = items_to_test.copy()
+            while items_to_test:
+                testing = items_to_test.pop()
+                reducing_state = state.copy()
+                for location in items_to_replace + items_to_test:
+                    reducing_state.collect(location.item, True, location)
+                reducing_state.sweep_for_advancements(locations=locations_to_test)
+                if needs_replacement(reducing_state):
+                    items_to_replace.append(testing)
+            return items_to_replace
+
+        def generate_placements(seed: int, balance: bool = True) -> typing.Dict[str, str]:
+            multiworld = generate_test_multiworld(4)
+            multiworld.random.seed(seed)
+            for player in multiworld.player_ids:
+                player_data = generate_player_data(multiworld, player, 8, prog_item_count=20, basic_item_count=52)
+                prog_item_names = [item.name for item in player_data.prog_items]
+                # regions that can be unlocked by different items, so which candidates are needed depends on the others
+                for _ in range(8):
+                    player_data.generate_region(
+                        player_data.regions[-1], 8,
+                        lambda state, player=player, names=multiworld.random.sample(prog_item_names, 3):
+                            state.has_any(names, player))
+                multiworld.completion_condition[player] = lambda state, player=player, names=prog_item_names: \
+                    state.has_all(names, player)
+                multiworld.worlds[player].options.progression_balancing.value = 99
+            distribute_items_restrictive(multiworld)
+            if balance:
+                balance_multiworld_progression(multiworld)
+            return {location.name: location.item.name for location in multiworld.get_filled_locations()}
+
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                placements = generate_placements(seed)
+                self.assertNotEqual(placements, generate_placements(seed, balance=False))
+                with unittest.mock.patch("Fill.find_items_to_replace", find_items_to_replace_by_recollecting):
+                    self.assertEqual(placements, generate_placements(seed))
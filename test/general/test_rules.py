@@ -0,0 +1,101 @@
+import unittest
+
+from BaseClasses import CollectionState, Item, ItemClassification, Region
+from worlds.generic.Rules import And, CanReachRegion, Count, Has, HasAll, HasAny, Or, Rule, add_rule, set_rule
+from . import generate_test_multiworld
+
+
+class TestRuleObjects(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.menu = self.multiworld.get_region("Menu", 1)
+        self.room = Region("Room", 1, self.multiworld)
+        self.multiworld.regions.append(self.room)
+        self.door = self.menu.connect(self.room, "Door")
+        self.state = CollectionState(self.multiworld)
+
+    def collect(self, item_name: str, player: int = 1) -> None:
+        self.state.collect(Item(item_name, ItemClassification.progression, None, player), True)
+
+    def test_and_flattens_item_checks(self) -> None:
+        """Tests that And merges nested item checks of each player into a single HasAll"""
+        rule = And(Has("Key", 1), And(HasAll(("Sword", "Shield"), 1), Has("Key", 1, 2)), Has("Key", 2),
+                   CanReachRegion("Menu", 1))
+        self.assertEqual(len(rule.rules), 3)
+        self.assertEqual(rule.rules[0].item_counts, {"Key": 2, "Sword": 1, "Shield": 1})
+        self.assertIsInstance(rule.rules[2], CanReachRegion)
+        self.assertIsNone(rule.get_item_dependencies(1))
+
+        for item_name in ("Key", "Sword", "Shield"):
+            self.collect(item_name)
+        self.collect("Key", 2)
+        self.assertFalse(rule(self.state))
+        self.collect("Key")
+        self.assertTrue(rule(self.state))
+
+    def test_or_flattens_item_checks(self) -> None:
+        """Tests that Or merges nested item checks of each player into a single HasAny"""
+        rule = Has("Key", 1, 3) | (HasAny(("Sword", "Shield"), 1) | Has("Key", 1, 2)) | Count(("Bomb", "Arrow"), 2, 1)
+        self.assertIsInstance(rule, Or)
+        self.assertEqual(len(rule.rules), 2)
+        self.assertEqual(rule.rules[0].item_counts, {"Key": 2, "Sword": 1, "Shield": 1})
+        self.assertEqual(rule.get_item_dependencies(1), {"Key", "Sword", "Shield", "Bomb", "Arrow"})
+        self.assertIsNone(rule.get_item_dependencies(2))
+
+        self.collect("Bomb")
+        self.assertFalse(rule(self.state))
+        self.collect("Arrow")
+        self.assertTrue(rule(self.state))
+
+    def test_rules_set_item_dependencies(self) -> None:
+        """Tests that set_rule and add_rule declare the item dependencies of an Entrance for rule objects only"""
+        set_rule(self.door, Has("Key", 1))
+        self.assertEqual(self.door.item_dependencies, {"Key"})
+        add_rule(self.door, HasAny(("Sword", "Shield"), 1))
+        self.assertIsInstance(self.door.access_rule, And)
+        self.assertEqual(self.door.item_dependencies, {"Key", "Sword", "Shield"})
+        add_rule(self.door, lambda state: state.has("Bomb", 1))
+        self.assertIsNone(self.door.item_dependencies)
+        # items of other players are collected into their own prog_items, so they don't make this one stale
+        set_rule(self.door, Has("Key", player=2))
+        self.assertIsNone(self.door.item_dependencies)
+
+        set_rule(self.door, Has("Key", 1) & HasAny(("Sword", "Shield"), 1))
+        self.assertFalse(self.state.can_reach_region("Room", 1))
+        self.collect("Key")
+        self.collect("Shield")
+        self.assertTrue(self.state.can_reach_region("Room", 1))
+
+    def test_rule_changed_after_update(self) -> None:
+        """Tests that a state updated before add_rule changed a rule rechecks it for the items of the new rule"""
+        set_rule(self.door, Has("A", 1))
+        self.assertFalse(self.state.can_reach_region("Room", 1))
+        add_rule(self.door, Has("B", 1), combine="or")
+        copied = self.state.copy()
+        copied.collect(Item("B", ItemClassification.progression, None, 1), True)
+        self.assertTrue(copied.can_reach_region("Room", 1))
+
+    def test_can_reach_region_keeps_index(self) -> None:
+        """Tests that an entrance checking a region registered as its indirect condition keeps the dependency index"""
+        hall = Region("Hall", 1, self.multiworld)
+        self.multiworld.regions.append(hall)
+        set_rule(self.door, Has("Key", 1))
+        hall_door = self.menu.connect(hall, "Hall Door")
+        set_rule(hall_door, Has("Sword", 1) & CanReachRegion("Room", 1))
+        self.assertIsNone(hall_door.item_dependencies, "the region is not registered as indirect condition yet")
+        self.multiworld.register_indirect_condition(self.room, hall_door)
+        self.assertEqual(hall_door.item_dependencies, {"Sword"})
+
+        self.collect("Sword")
+        self.assertFalse(self.state.can_reach_region("Hall", 1))
+        self.assertEqual(self.multiworld.regions.entrance_dependencies[1], {"Key": [self.door], "Sword": [hall_door]})
+        self.collect("Key")
+        self.assertTrue(self.state.can_reach_region("Hall", 1))
+
+    def test_incomplete_rule(self) -> None:
+        """Tests that a Rule without __call__ can't be created"""
+        class Incomplete(Rule):
+            __slots__ = ()
+
+        with self.assertRaises(TypeError):
+            Incomplete()
@@ -0,0 +1,40 @@
+import unittest
+
+from BaseClasses import Item, ItemClassification
+from worlds.generic.Rules import set_rule
+from . import generate_locations, generate_test_multiworld
+
+
+class TestPlaythrough(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        menu = self.multiworld.get_region("Menu", 1)
+        self.locations = generate_locations(6, 1, menu)
+        for location, name in zip(self.locations, ("Key", "Spare", "Other Spare", "Big Key", "Spare Key", "Goal")):
+            self.multiworld.push_item(location, Item(name, ItemClassification.progression, None, 1), False)
+        for location in self.locations[2:]:
+            set_rule(location, lambda state: state.has("Key", 1))
+        set_rule(self.locations[5], lambda state: state.has("Big Key", 1) or state.has("Spare Key", 1))
+        self.multiworld.completion_condition[1] = lambda state: state.has("Goal", 1)
+
+    def get_playthrough_items(self):
+        return [sorted(sphere.values()) for name, sphere in self.multiworld.spoiler.playthrough.items() if name != "0"]
+
+    def test_only_required_items(self) -> None:
+        """Tests that the playthrough only keeps one of two alternative items required to beat the game"""
+        self.multiworld.spoiler.create_playthrough(create_paths=False)
+        playthrough = self.get_playthrough_items()
+        self.assertEqual(len(playthrough), 3)
+        self.assertEqual(playthrough[0], ["Key"])
+        self.assertIn(playthrough[1], (["Big Key"], ["Spare Key"]))
+        self.assertEqual(playthrough[2], ["Goal"])
+
+    def test_time_limit(self) -> None:
+        """Tests that reaching the time limit keeps the remaining items in the playthrough"""
+        with self.assertLogs(level="WARNING"):
+            self.multiworld.spoiler.create_playthrough(create_paths=False, time_limit=1e-9)
+        self.assertEqual(self.get_playthrough_items(), [
+            ["Key", "Spare"],
+            ["Big Key", "Other Spare", "Spare Key"],
+            ["Goal"],
+        ])
@@ -1,7 +1,11 @@
+import concurrent.futures
 import unittest
+from typing import Dict
 
+from BaseClasses import CollectionState, Entrance, Item, ItemClassification, Location, Region
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from worlds.generic.Rules import set_rule
+from . import generate_locations, generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +31,195 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.rule_calls: Dict[str, int] = {}
+        self.entrances: Dict[str, Entrance] = {}
+        for player in (1, 2):
+            menu = self.multiworld.get_region("Menu", player)
+            for item_name in ("Key", "Other Key"):
+                region = Region(f"{item_name} Room", player, self.multiworld)
+                self.multiworld.regions.append(region)
+                entrance = menu.connect(region, f"{item_name} Door", self.counted_rule(item_name))
+                entrance.set_item_dependencies({item_name})
+                if player == 1:
+                    self.entrances[item_name] = entrance
+
+    def counted_rule(self, item_name: str):
+        self.rule_calls[item_name] = 0
+
+        def rule(state: CollectionState) -> bool:
+            self.rule_calls[item_name] += 1
+            return state.has(item_name, 1)
+        return rule
+
+    def collect(self, state: CollectionState, item_name: str) -> None:
+        state.collect(Item(item_name, ItemClassification.progression, None, 1), True)
+
+    def test_only_dependent_entrances_rechecked(self) -> None:
+        """Tests that collecting an item only rechecks the blocked entrances depending on it"""
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Key Room", 1))
+        self.assertEqual(self.rule_calls, {"Key": 1, "Other Key": 1})
+
+        self.collect(state, "Key")
+        self.assertTrue(state.can_reach_region("Key Room", 1))
+        self.assertFalse(state.can_reach_region("Other Key Room", 1))
+        self.assertEqual(self.rule_calls, {"Key": 2, "Other Key": 1})
+
+        self.collect(state, "Other Key")
+        self.assertTrue(state.can_reach_region("Other Key Room", 1))
+        self.assertEqual(self.rule_calls, {"Key": 2, "Other Key": 2})
+
+    def test_undeclared_dependencies_fall_back(self) -> None:
+        """Tests that a single entrance without declared dependencies makes every blocked entrance get rechecked"""
+        set_rule(self.entrances["Other Key"], self.counted_rule("Other Key"))
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Key Room", 1))
+
+        self.collect(state, "Key")
+        self.assertTrue(state.can_reach_region("Key Room", 1))
+        self.assertEqual(self.rule_calls, {"Key": 2, "Other Key": 2})
+
+    def test_rule_changed_after_update(self) -> None:
+        """Tests that states and their copies recheck entrances whose rule changed after they were updated"""
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Key Room", 1))
+        entrance = self.entrances["Key"]
+        entrance.access_rule = lambda state_: state_.has_any(("Key", "Other Key"), 1)
+        entrance.set_item_dependencies({"Key", "Other Key"})
+
+        copied = state.copy()
+        self.collect(copied, "Other Key")
+        self.assertTrue(copied.can_reach_region("Key Room", 1))
+        self.collect(state, "Other Key")
+        self.assertTrue(state.can_reach_region("Key Room", 1))
+
+        # a rule passing without new items is found on the next update
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Key Room", 1))
+        set_rule(entrance, lambda state_: True)
+        self.collect(state, "Unrelated")
+        self.assertTrue(state.can_reach_region("Key Room", 1))
+        self.assertIsNone(entrance.item_dependencies, "setting a rule resets its dependencies")
+
+    def test_replaced_rule_ignores_dependencies(self) -> None:
+        """Tests that dependencies declared for a rule are not used once the rule is replaced without declaring them"""
+        self.entrances["Other Key"].access_rule = lambda state_: state_.has("Key", 1)
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Other Key Room", 1))
+        self.assertIsNone(self.multiworld.regions.entrance_dependencies[1])
+
+        self.collect(state, "Key")
+        self.assertTrue(state.can_reach_region("Other Key Room", 1))
+
+    def test_rule_change_keeps_other_players(self) -> None:
+        """Tests that changing an entrance rule only invalidates the dependencies of the entrance's player"""
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Key Room", 1))
+        self.assertFalse(state.can_reach_region("Key Room", 2))
+        other_dependencies = self.multiworld.regions.entrance_dependencies[2]
+        self.assertIsNotNone(other_dependencies)
+
+        set_rule(self.entrances["Key"], self.counted_rule("Key"))
+        self.assertNotIn(1, self.multiworld.regions.entrance_dependencies)
+        self.assertIs(self.multiworld.regions.entrance_dependencies[2], other_dependencies)
+
+
+class TestCopyOnAccess(unittest.TestCase):
+    def test_copy_isolates_player_data(self) -> None:
+        """Tests that states sharing per-player containers after copy don't see each other's changes"""
+        multiworld = generate_test_multiworld(2)
+        state = CollectionState(multiworld)
+        state.collect(Item("Key", ItemClassification.progression, None, 1), True)
+
+        copied = state.copy()
+        self.assertIs(copied.prog_items.shared[2], state.prog_items.shared[2])
+        copied.collect(Item("Key", ItemClassification.progression, None, 1), True)
+        state.collect(Item("Other Key", ItemClassification.progression, None, 2), True)
+
+        self.assertEqual(state.count("Key", 1), 1)
+        self.assertEqual(copied.count("Key", 1), 2)
+        self.assertTrue(state.has("Other Key", 2))
+        self.assertFalse(copied.has("Other Key", 2))
+        self.assertEqual(state.copy().prog_items, state.prog_items)
+
+
+class TestConcurrentSweep(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(3)
+        for player in self.multiworld.player_ids:
+            menu = self.multiworld.get_region("Menu", player)
+            # each location requires the item of the previous one, which belongs to the next player
+            previous_item = None
+            for i, location in enumerate(generate_locations(5, player, menu)):
+                owner = player % self.multiworld.players + 1
+                item = Item(f"Item {i}", ItemClassification.progression, None, owner)
+                if previous_item:
+                    set_rule(location, lambda state, name=previous_item.name, owner=previous_item.player:
+                             state.has(name, owner))
+                self.multiworld.push_item(location, item, False)
+                previous_item = item
+
+    def test_same_result_as_single_threaded(self) -> None:
+        """Tests that sweeping with an executor collects the same advancements as sweeping in a single thread"""
+        state = CollectionState(self.multiworld)
+        state.sweep_for_advancements()
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            self.multiworld.sweep_executor = executor
+            concurrent_state = CollectionState(self.multiworld)
+            concurrent_state.sweep_for_advancements()
+        del self.multiworld.sweep_executor
+
+        self.assertEqual(state.advancements, concurrent_state.advancements)
+        self.assertEqual(state.prog_items, concurrent_state.prog_items)
+        self.assertEqual(len(state.advancements), 15)
+
+
+class TestLogicalSpheres(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        menu = self.multiworld.get_region("Menu", 1)
+        self.locations = {location.name: location for location in generate_locations(6, 1, menu, 1)}
+        self.event = Location(1, "Event", None, menu)
+        menu.locations.append(self.event)
+        self.multiworld.push_item(self.event, Item("Event", ItemClassification.progression, None, 1), False)
+        set_rule(self.event, lambda state: state.has("Key", 1))
+
+        key, big_key, after_key, after_event, after_big_key, never = self.locations.values()
+        self.multiworld.push_item(key, Item("Key", ItemClassification.progression, 1, 1), False)
+        self.multiworld.push_item(after_key, Item("Big Key", ItemClassification.progression, 1, 1), False)
+        set_rule(after_key, lambda state: state.has("Key", 1))
+        set_rule(after_event, lambda state: state.has("Event", 1))
+        set_rule(after_big_key, lambda state: state.has("Big Key", 1))
+        set_rule(never, lambda state: False)
+        for location in (big_key, after_event, after_big_key, never):
+            self.multiworld.push_item(location, Item("Filler", ItemClassification.filler, 2, 1), False)
+
+    def test_spheres(self) -> None:
+        """Tests that every filled location ends up in the sphere it first becomes reachable in"""
+        key, big_key, after_key, after_event, after_big_key, never = self.locations.values()
+        self.assertEqual(list(self.multiworld.get_spheres()), [
+            {key, big_key}, {after_key, self.event}, {after_event, after_big_key}, set(), {never}
+        ])
+
+    def test_sendable_spheres(self) -> None:
+        """Tests that events are collected as soon as they are reachable, without being put in a sphere"""
+        key, big_key, after_key, after_event, after_big_key, never = self.locations.values()
+        self.assertEqual(list(self.multiworld.get_sendable_spheres()), [
+            {key, big_key}, {after_key, after_event}, {after_big_key}, set(), {never}
+        ])
+
+    def test_cached_once_final(self) -> None:
+        """Tests that spheres are only computed once when caching is enabled"""
+        self.assertIsNot(self.multiworld.get_logical_spheres(), self.multiworld.get_logical_spheres())
+        self.multiworld.cache_spheres = True
+        spheres = self.multiworld.get_logical_spheres()
+        self.assertIs(spheres, self.multiworld.get_logical_spheres())
+        self.assertIsNot(spheres, self.multiworld.get_logical_spheres(sendable=True))
+        self.assertTrue(spheres.get_state(1).has("Key", 1))
+        self.assertFalse(spheres.get_state(0).has("Key", 1))
@@ -0,0 +1,87 @@
+# Tests for NetUtils.CheckedLocations and NetUtils.LocationChecks
+import unittest
+
+from NetUtils import CheckedLocations, LocationChecks, LocationStore, _LocationStore
+
+sample_data = {
+    1: {
+        13: (21, 2, 0),
+        11: (22, 2, 0),
+        12: (13, 1, 0),
+    },
+    2: {
+        21: (11, 1, 0),
+    },
+}
+
+
+class TestCheckedLocations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.checked = CheckedLocations([11, 12, 13, 20])
+
+    def test_set_operations(self) -> None:
+        self.checked |= {13, 11}
+        self.assertEqual(self.checked.bits, 0b0101)
+        self.assertEqual(len(self.checked), 2)
+        self.assertIn(11, self.checked)
+        self.assertNotIn(12, self.checked)
+        self.assertNotIn(14, self.checked)
+        self.assertEqual(self.checked, {11, 13})
+        new_locations = {11, 12, 14} - self.checked
+        self.assertIs(type(new_locations), set)
+        self.assertEqual(new_locations, {12, 14})
+        self.checked.discard(11)
+        self.checked.discard(14)
+        self.assertEqual(set(self.checked), {13})
+        with self.assertRaises(KeyError):
+            self.checked.add(14)
+
+    def test_checked_and_missing(self) -> None:
+        self.assertEqual(self.checked.get_checked(), [])
+        self.assertEqual(self.checked.get_missing(), [11, 12, 13, 20])
+        self.checked.add(20)
+        self.checked.add(12)
+        self.assertEqual(self.checked.get_checked(), [12, 20])
+        self.assertEqual(self.checked.get_missing(), [11, 13])
+        self.checked |= {11, 13}
+        self.assertEqual(self.checked.get_missing(), [])
+
+
+class Base:
+    class TestLocationChecks(unittest.TestCase):
+        store_type: type
+
+        def setUp(self) -> None:
+            self.location_checks = LocationChecks(self.store_type(sample_data))
+
+        def test_slot_locations_shared(self) -> None:
+            self.location_checks[0, 1].add(12)
+            self.assertEqual(self.location_checks[1, 1].get_missing(), [11, 12, 13])
+            self.assertIs(self.location_checks[0, 1].locations, self.location_checks[1, 1].locations)
+            with self.assertRaises(KeyError):
+                _ = self.location_checks[0, 3]
+
+        def test_save_roundtrip(self) -> None:
+            self.location_checks[0, 1] |= {11, 13}
+            _ = self.location_checks[0, 2]
+            bitmaps = self.location_checks.get_bitmaps()
+            self.assertEqual(bitmaps, {(0, 1): 0b101})
+            loaded = LocationChecks(self.store_type(sample_data))
+            loaded.load(bitmaps)
+            self.assertEqual(loaded[0, 1].get_checked(), [11, 13])
+            self.assertEqual(len(loaded[0, 2]), 0)
+
+        def test_load_sets(self) -> None:
+            """Tests that checks from saves before bitmaps are migrated, ignoring unknown locations"""
+            self.location_checks.load({(0, 1): {12, 99}, (0, 2): set()})
+            self.assertEqual(self.location_checks[0, 1].get_checked(), [12])
+            self.assertEqual(self.location_checks.get_bitmaps(), {(0, 1): 0b010})
+
+
+class TestPurePythonLocationChecks(Base.TestLocationChecks):
+    store_type = _LocationStore
+
+
+@unittest.skipIf(LocationStore is _LocationStore, "_speedups not available")
+class TestSpeedupsLocationChecks(Base.TestLocationChecks):
+    store_type = LocationStore
@@ -112,9 +112,16 @@ class Base:
             self.assertEqual(sorted(self.store.find_item(set(range(2048)), 13)),
                              [(1, 13, 13, 1, 0)])
 
+        def test_find_item_order(self) -> None:
+            # results are in order of finding player and location, independent of the order of slots
+            self.assertEqual(list(self.store.find_item({5, 4, 3}, 99)),
+                             [(3, 9, 99, 4, 0), (4, 9, 99, 3, 0), (5, 9, 99, 5, 0)])
+            self.assertEqual([location for _, location, *_ in self.store.find_item({1}, 11)], [23])
+
         def test_get_for_player(self) -> None:
             self.assertEqual(self.store.get_for_player(3), {4: {9}})
             self.assertEqual(self.store.get_for_player(1), {1: {13}, 2: {22, 23}})
+            self.assertEqual(list(self.store.get_for_player(1)), [1, 2])
             self.assertEqual(self.store.get_for_player(9999), {})
 
         def test_get_checked(self) -> None:
@@ -1,5 +1,6 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import json
 import unittest
 import os
 import os.path
@@ -72,6 +73,22 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_generate_profile(self):
+        sys.argv = [sys.argv[0], '--seed', '0', '--profile',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+        print(f'Testing Generate.py {sys.argv} in {os.getcwd()}')
+        Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        profile_files = list(Path(self.output_tempdir.name).glob('*_Profile.json'))
+        self.assertEqual(len(profile_files), 1)
+        with profile_files[0].open(encoding='utf-8') as f:
+            profile = json.load(f)
+        steps = {event["name"] for event in profile["traceEvents"]}
+        self.assertLessEqual({"create_regions", "fill", "output"}, steps)
+        self.assertIn("Location.can_reach", profile["otherData"]["counters"])
+
     def test_generate_yaml(self):
         # override host.yaml
         from settings import get_settings
@@ -108,6 +125,7 @@ class TestGenerateWeights(TestGenerateMain):
     # don't need to run these tests
     test_generate_absolute = None
     test_generate_relative = None
+    test_generate_profile = None
 
     def test_generate_yaml(self):
         from settings import get_settings
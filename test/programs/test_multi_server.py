@@ -1,10 +1,36 @@
+import collections
+import copy
+import functools
+import json
+import asyncio
+import os
+import secrets
+import socket
+import tempfile
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import unittest.mock
+
+import websockets
+from typing_extensions import override
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory, PerMessageDeflate
+
+import MultiServer
+from MultiServer import Client, Context, SaveJournal, ServerCommandProcessor, ShardedServer, broadcast_compressed, \
+    broadcast_per_message_deflate_factory, run_front, send_items_to, send_new_items, serve_front
+from NetUtils import Endpoint, Hint, HintStatus, LocationChecks, LocationStore, NetworkItem, NetworkSlot, SlotType
+from Utils import get_intended_text
+
+
+@functools.lru_cache(maxsize=None)
+def get_context() -> Context:
+    # Context removes the name groups from the shared data package, so it can only be created once
+    return Context("", 0, "", "", 0, 0, False)
 
 
 class TestResolvePlayerName(unittest.TestCase):
     def test_resolve(self) -> None:
-        p = ServerCommandProcessor(Context("", 0, "", "", 0, 0, False))
+        p = ServerCommandProcessor(copy.copy(get_context()))
         p.ctx.player_names = {
             (1, 1): "AAA",
             (1, 2): "aBc",
@@ -38,3 +64,420 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestHints(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        self.ctx = copy.copy(get_context())
+        self.ctx.hints = collections.defaultdict(set)
+        self.ctx.hints_by_location = {}
+        self.ctx.location_checks = LocationChecks(LocationStore({
+            1: {11: (1, 2, 0), 12: (2, 2, 0)},
+            2: {21: (3, 1, 0)},
+            3: {},
+        }))
+        self.hint = Hint(2, 1, 11, 1, False)
+        self.other_hint = Hint(2, 1, 12, 2, False)
+        for slot in (1, 2):
+            self.ctx.add_hint(0, slot, self.hint)
+            self.ctx.add_hint(0, slot, self.other_hint)
+        self.ctx.add_hint(0, 1, Hint(1, 2, 21, 3, False))
+
+    def test_get_hint(self) -> None:
+        self.assertIs(self.ctx.get_hint(0, 1, 11), self.hint)
+        self.assertIsNone(self.ctx.get_hint(0, 2, 11))
+        self.assertIsNone(self.ctx.get_hint(1, 1, 11))
+
+    def test_recheck_location_hints(self) -> None:
+        """Tests that checking a location only updates its hints, and reports the slots that have them"""
+        self.ctx.location_checks[0, 1].add(11)
+        changed: typing.Set[typing.Tuple[int, int]] = set()
+        self.ctx.recheck_location_hints(0, 1, [11], changed)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        found_hint = self.hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        for slot in (1, 2):
+            self.assertIn(found_hint, self.ctx.hints[0, slot])
+            self.assertIn(self.other_hint, self.ctx.hints[0, slot])
+        self.assertEqual(self.ctx.get_hint(0, 1, 11), found_hint)
+
+        changed.clear()
+        self.ctx.recheck_location_hints(0, 1, [11, 12], changed)
+        self.assertEqual(changed, set())
+
+    def test_index_hints(self) -> None:
+        """Tests that the location index is rebuilt from hints set as a whole"""
+        self.ctx.hints[0, 3] = {Hint(3, 1, 12, 2, False)}
+        self.ctx.index_hints()
+        self.assertEqual(self.ctx.hints_by_location[0, 1, 12].keys(), {1, 2, 3})
+        self.ctx.location_checks[0, 1].add(12)
+        changed: typing.Set[typing.Tuple[int, int]] = set()
+        self.ctx.recheck_location_hints(0, 1, [12], changed)
+        self.assertEqual(changed, {(0, 1), (0, 2), (0, 3)})
+
+
+class TestSendNewItems(unittest.IsolatedAsyncioTestCase):
+    async def test_send_to_receivers(self) -> None:
+        """Tests that only clients of slots that were sent items are sent them"""
+        ctx = copy.copy(get_context())
+        ctx.groups = {}
+        ctx.received_items = {}
+        ctx.new_items_receivers = set()
+        ctx.start_inventory = {}
+        ctx.clients = {0: {}, 1: {}}
+        sent: typing.List[typing.Tuple[int, int, int]] = []
+        for team in ctx.clients:
+            for slot in (1, 2):
+                client = Client(unittest.mock.Mock(), ctx)
+                client.team, client.slot = team, slot
+                client.remote_items = client.remote_start_inventory = True
+                ctx.clients[team][slot] = [client]
+
+        async def send_msgs(endpoint: Endpoint, msgs: typing.Iterable[typing.Dict[str, typing.Any]]) -> bool:
+            assert isinstance(endpoint, Client) and endpoint.team is not None and endpoint.slot is not None
+            sent.extend((endpoint.team, endpoint.slot, msg["index"]) for msg in msgs)
+            return True
+
+        with unittest.mock.patch.object(ctx, "send_msgs", send_msgs):
+            send_items_to(ctx, 0, 2, NetworkItem(1, 1, 1, 0), NetworkItem(2, 2, 1, 0))
+            send_items_to(ctx, 1, 1, NetworkItem(3, 1, 2, 0))
+            send_new_items(ctx)
+            send_items_to(ctx, 0, 2, NetworkItem(4, 3, 1, 0))
+            send_new_items(ctx)
+            send_new_items(ctx)
+            await asyncio.sleep(0)
+        self.assertEqual(sorted(sent), [(0, 2, 0), (0, 2, 2), (1, 1, 0)])
+        self.assertEqual(ctx.new_items_receivers, set())
+
+    async def test_texts_before_items(self) -> None:
+        """Tests that texts queued for the next event loop iteration are still sent before the items sent after them"""
+        ctx = copy.copy(get_context())
+        ctx.groups = {}
+        ctx.received_items = {}
+        ctx.new_items_receivers = set()
+        ctx.start_inventory = {}
+        ctx.pending_team_texts = {}
+        client = Client(unittest.mock.Mock(), ctx)
+        client.team, client.slot = 0, 1
+        ctx.clients = {0: {1: [client]}}
+        sent: typing.List[typing.List[str]] = []
+
+        async def send_msgs(endpoint: Endpoint, msgs: typing.Iterable[typing.Dict[str, typing.Any]]) -> bool:
+            sent.append([msg["cmd"] for msg in msgs])
+            return True
+
+        def broadcast_encoded_msgs(endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
+            if client in endpoints:
+                sent.append([msg["cmd"] for msg in json.loads(msg)])
+            return True
+
+        with unittest.mock.patch.object(ctx, "send_msgs", send_msgs), \
+                unittest.mock.patch.object(ctx, "broadcast_encoded_msgs", broadcast_encoded_msgs):
+            ctx.broadcast_team_texts(0, [{"cmd": "PrintJSON", "data": [{"text": "first"}]}])
+            send_items_to(ctx, 0, 1, NetworkItem(1, 1, 2, 0))
+            send_new_items(ctx)
+            ctx.broadcast_team_texts(0, [{"cmd": "PrintJSON", "data": [{"text": "second"}]}])
+            await asyncio.sleep(0)
+        self.assertEqual(sent, [["PrintJSON", "PrintJSON"], ["ReceivedItems"]])
+
+
+class TestFuzzyNameIndex(unittest.TestCase):
+    def test_shared_by_checksum(self) -> None:
+        """Tests that the name index of a game is shared by contexts with the same checksum, and rebuilt for others"""
+        contexts = [copy.copy(get_context()) for _ in range(3)]
+        for ctx, checksum in zip(contexts, ("a", "a", "b")):
+            ctx.checksums = {"Game": checksum}
+            ctx.all_item_and_group_names = {"Game": {"Sword", "Shield", "Weapons"}}
+            ctx.all_location_and_group_names = {"Game": {"Chest"}}
+        index = contexts[0].get_fuzzy_name_index("Game")
+        self.assertEqual(get_intended_text("sword", index)[:2], ("Sword", True))
+        self.assertIs(contexts[1].get_fuzzy_name_index("Game"), index)
+        self.assertIsNot(contexts[2].get_fuzzy_name_index("Game"), index)
+        self.assertEqual(contexts[0].get_fuzzy_name_index("Game", True).names, ("Chest",))
+
+
+class TestEncodedMessages(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        self.ctx = copy.copy(get_context())
+        self.ctx.encoded_game_data = {}
+        self.ctx.encoded_players_package = None
+        self.ctx.encoded_slot_info = None
+        self.ctx.encoded_slot_data = {}
+
+    def test_data_package(self) -> None:
+        """Tests that the assembled DataPackage is the same as encoding it as a whole, and is cached per checksum"""
+        games = ["Archipelago", next(game for game in self.ctx.gamespackage if game != "Archipelago")]
+        encoded = self.ctx.get_encoded_data_package(games)
+        self.assertEqual(encoded, self.ctx.dumper([{"cmd": "DataPackage", "data": {"games": {
+            game: self.ctx.gamespackage[game] for game in games}}}]))
+        game_package = self.ctx.gamespackage[games[1]]
+        assert "checksum" in game_package
+        self.assertIs(self.ctx.encoded_game_data[game_package["checksum"]], self.ctx.get_encoded_game_data(games[1]))
+
+    def test_connected(self) -> None:
+        """Tests that the assembled Connected is the same as encoding it as a whole, and follows alias changes"""
+        self.ctx.player_names = {(0, 1): "Player1", (0, 2): "Player2"}
+        self.ctx.name_aliases = {}
+        self.ctx.slot_info = {1: NetworkSlot("Player1", "Archipelago", SlotType.player),
+                              2: NetworkSlot("Player2", "Archipelago", SlotType.player)}
+        slot_data: typing.Dict[int, typing.Mapping[str, typing.Any]] = {1: {"option": 1}, 2: {}}
+        self.ctx.slot_data = slot_data
+        packet: typing.Dict[str, typing.Any] = {"cmd": "Connected", "team": 0, "slot": 1, "missing_locations": [1],
+                                                "checked_locations": [], "hint_points": 0}
+        for with_slot_data in (True, False):
+            for alias in ("", "Alias"):
+                if alias:
+                    self.ctx.name_aliases[0, 2] = alias
+                expected: typing.Dict[str, typing.Any] = {**packet, "players": self.ctx.get_players_package(),
+                                                          "slot_info": self.ctx.slot_info}
+                if with_slot_data:
+                    expected["slot_data"] = self.ctx.slot_data[1]
+                self.assertEqual(json.loads(self.ctx.get_encoded_connected(packet, 1, with_slot_data)),
+                                 json.loads(self.ctx.dumper(expected)))
+            self.ctx.name_aliases.clear()
+
+
+class TestGetSphere(unittest.TestCase):
+    def test_get_sphere(self) -> None:
+        ctx = copy.copy(get_context())
+        ctx.spheres = []
+        ctx.location_spheres = None
+        self.assertEqual(ctx.get_sphere(1, 10), -1)
+
+        ctx.spheres = [{1: {10}, 2: {20}}, {1: {11, 12}}, {2: {21}, 1: {11}}]
+        self.assertEqual(ctx.get_sphere(1, 10), 0)
+        self.assertEqual(ctx.get_sphere(1, 11), 1)
+        self.assertEqual(ctx.get_sphere(2, 21), 2)
+        with self.assertRaises(KeyError):
+            ctx.get_sphere(2, 10)
+        with self.assertRaises(KeyError):
+            ctx.get_sphere(3, 10)
+
+
+class TestSaveJournal(unittest.TestCase):
+    save: typing.Dict[str, typing.Any]
+    snapshot: typing.Dict[str, typing.Any]
+
+    @override
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.file_path = os.path.join(self.temp_dir.name, "test.apjournal")
+        received_items: typing.Dict[typing.Tuple[int, int, bool], typing.List[NetworkItem]] = {
+            (0, 1, True): [NetworkItem(1, 2, 2, 0)]
+        }
+        hints: typing.Dict[typing.Tuple[int, int], typing.Set[str]] = {(0, 1): set()}
+        self.save = {
+            "received_items": received_items,
+            "hints": hints,
+            "location_checks": {(0, 2): 0b1},
+            "client_activity_timers": (((0, 1), 1.0),),
+            "stored_data": {"counter": 0},
+            "random_state": 1,
+            "journal_generation": 1,
+        }
+        self.journal = SaveJournal(self.file_path)
+        self.journal.start(self.save, 100)
+        self.snapshot = copy.deepcopy(self.save)
+
+    def test_replay(self) -> None:
+        """Tests that replaying the journal onto the snapshot results in the latest save"""
+        self.save["received_items"][0, 1, True].append(NetworkItem(3, 4, 2, 0))
+        self.save["received_items"][0, 2, True] = [NetworkItem(5, 6, 1, 0)]
+        self.save["location_checks"][0, 2] |= 0b100
+        self.journal.append(self.save)
+        size = self.journal.size
+        self.journal.append(self.save)
+        self.assertEqual(self.journal.size, size, "unchanged save should not append a record")
+
+        self.save["hints"][0, 1].add("hint")
+        self.save["client_activity_timers"] = (((0, 1), 2.0), ((0, 2), 3.0))
+        self.save["stored_data"]["counter"] = 1
+        self.journal.changed_stored_data.add("counter")
+        self.save["random_state"] = 2
+        self.journal.append(self.save)
+
+        replayed = SaveJournal(self.file_path).replay(self.snapshot)
+        self.assertEqual(replayed, 2)
+        self.assertEqual(self.snapshot, self.save)
+
+    def test_incomplete_record(self) -> None:
+        """Tests that a record cut off while writing is ignored"""
+        self.save["location_checks"][0, 2] = 0b11
+        self.journal.append(self.save)
+        self.save["location_checks"][0, 2] = 0b111
+        self.journal.append(self.save)
+        with open(self.file_path, "r+b") as f:
+            f.truncate(self.journal.size - 1)
+
+        self.assertEqual(SaveJournal(self.file_path).replay(self.snapshot), 1)
+        self.assertEqual(self.snapshot["location_checks"], {(0, 2): 0b11})
+
+    def test_other_generation(self) -> None:
+        """Tests that a journal is not replayed onto a snapshot it doesn't belong to"""
+        self.save["location_checks"][0, 2] = 0b11
+        self.journal.append(self.save)
+        self.snapshot["journal_generation"] = 2
+
+        self.assertEqual(SaveJournal(self.file_path).replay(self.snapshot), 0)
+        self.assertEqual(self.snapshot["location_checks"], {(0, 2): 0b1})
+
+
+class TestBroadcastCompressed(unittest.IsolatedAsyncioTestCase):
+    async def test_broadcast(self) -> None:
+        """Tests that a broadcast reaches clients with different compression settings"""
+        server_sockets: typing.List[websockets.WebSocketServerProtocol] = []
+        connected = asyncio.Event()
+
+        async def handler(websocket: websockets.WebSocketServerProtocol) -> None:
+            server_sockets.append(websocket)
+            if len(server_sockets) == 3:
+                connected.set()
+            await websocket.wait_closed()
+
+        async with websockets.serve(handler, "localhost", 0,
+                                    extensions=[broadcast_per_message_deflate_factory]) as server:
+            uri = f"ws://localhost:{next(iter(server.sockets)).getsockname()[1]}"
+            clients = [
+                await websockets.connect(uri, compression=None),
+                await websockets.connect(uri, extensions=[ClientPerMessageDeflateFactory()], compression=None),
+                await websockets.connect(uri, extensions=[ClientPerMessageDeflateFactory(server_max_window_bits=9)],
+                                         compression=None),
+            ]
+            await connected.wait()
+            window_bits = sorted(extension.local_max_window_bits for socket in server_sockets
+                                 for extension in socket.extensions if isinstance(extension, PerMessageDeflate))
+            self.assertEqual(window_bits, [9, 11])
+            msgs = ['[{"cmd": "PrintJSON", "data": [{"text": "' + "hint" * i * 100 + '"}]}]' for i in range(3)]
+            for msg in msgs:
+                broadcast_compressed(server_sockets, msg)
+            for client in clients:
+                self.assertEqual([await client.recv() for _ in msgs], msgs)
+                await client.close()
+
+
+class TestFronts(unittest.IsolatedAsyncioTestCase):
+    @staticmethod
+    def get_free_port() -> int:
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            return free_socket.getsockname()[1]
+
+    async def start_fronts(self, ctx: Context, port: int, count: int) -> None:
+        """Starts fronts in this process and waits until all are linked, stopping them at the end of the test"""
+        token = secrets.token_bytes(32)
+        linked: typing.List[None] = []
+        link_server = await asyncio.start_server(
+            functools.partial(serve_front, ctx=ctx, token=token, on_linked=lambda: linked.append(None)),
+            "127.0.0.1", 0)
+        link_port = link_server.sockets[0].getsockname()[1]
+        fronts = [asyncio.create_task(run_front("127.0.0.1", port, link_port, token)) for _ in range(count)]
+
+        async def stop() -> None:
+            link_server.close()
+            for front in fronts:
+                front.cancel()
+            await asyncio.gather(*fronts, return_exceptions=True)
+
+        self.addAsyncCleanup(stop)
+        for _ in range(100):
+            if len(linked) == count:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(linked), count)
+
+    async def wait_disconnected(self, ctx: Context) -> None:
+        for _ in range(50):
+            if not ctx.endpoints:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(ctx.endpoints, [])
+
+    async def test_clients_through_fronts(self) -> None:
+        """Tests that clients connected to different fronts are served by the context of the link server"""
+        ctx = copy.copy(get_context())
+        ctx.endpoints = []
+        port = self.get_free_port()
+        await self.start_fronts(ctx, port, 2)
+        clients = [await websockets.connect(f"ws://127.0.0.1:{port}", compression=compression)
+                   for compression in ("deflate", None, "deflate", None)]
+        for client in clients:
+            room_info = json.loads(await client.recv())
+            self.assertEqual(room_info[0]["cmd"], "RoomInfo")
+        self.assertEqual(len(ctx.endpoints), len(clients))
+        for client in clients:
+            await client.send(json.dumps([{"cmd": "GetDataPackage", "games": ["Archipelago"]}]))
+            data_package = json.loads(await client.recv())
+            self.assertEqual(data_package[0]["cmd"], "DataPackage")
+            self.assertIn("Archipelago", data_package[0]["data"]["games"])
+            await client.close()
+        await self.wait_disconnected(ctx)
+
+    async def test_slow_command(self) -> None:
+        """Tests that a slow command of one client doesn't hold up the commands of other clients of the same front"""
+        ctx = copy.copy(get_context())
+        ctx.endpoints = []
+        port = self.get_free_port()
+        await self.start_fronts(ctx, port, 1)
+        slow_client, other_client = [await websockets.connect(f"ws://127.0.0.1:{port}") for _ in range(2)]
+        for client in (slow_client, other_client):
+            await client.recv()  # RoomInfo
+        slow_client_endpoint = ctx.endpoints[0]
+        release = asyncio.Event()
+        process_client_cmd = MultiServer.process_client_cmd
+
+        async def slow_process_client_cmd(ctx: Context, client: MultiServer.Client,
+                                          args: typing.Dict[str, typing.Any]) -> None:
+            if client is slow_client_endpoint and args.get("games") == ["slow"]:
+                await release.wait()
+            await process_client_cmd(ctx, client, args)
+
+        with unittest.mock.patch("MultiServer.process_client_cmd", slow_process_client_cmd):
+            await slow_client.send(json.dumps([{"cmd": "GetDataPackage", "games": ["slow"]}]))
+            await slow_client.send(json.dumps([{"cmd": "GetDataPackage", "games": ["Archipelago"]}]))
+            await other_client.send(json.dumps([{"cmd": "GetDataPackage", "games": ["Archipelago"]}]))
+            data_package = json.loads(await asyncio.wait_for(other_client.recv(), 5))
+            self.assertIn("Archipelago", data_package[0]["data"]["games"])
+            release.set()
+            # the slow client's commands are still run in order
+            data_package = json.loads(await asyncio.wait_for(slow_client.recv(), 5))
+            self.assertNotIn("Archipelago", data_package[0]["data"]["games"])
+            data_package = json.loads(await asyncio.wait_for(slow_client.recv(), 5))
+            self.assertIn("Archipelago", data_package[0]["data"]["games"])
+        for client in (slow_client, other_client):
+            await client.close()
+        await self.wait_disconnected(ctx)
+
+
+@unittest.skipUnless(hasattr(socket, "SO_REUSEPORT"), "fronts require SO_REUSEPORT")
+class TestShardedServer(unittest.IsolatedAsyncioTestCase):
+    def get_context(self, port: int) -> Context:
+        ctx = copy.copy(get_context())
+        ctx.endpoints = []
+        ctx.host = "127.0.0.1"
+        ctx.port = port
+        return ctx
+
+    async def test_start(self) -> None:
+        """Tests that starting the server waits until its fronts accept connections"""
+        server = ShardedServer(self.get_context(TestFronts.get_free_port()), 2, None, None, "warning")
+        try:
+            await server
+            self.assertEqual(server.linked_fronts, 2)
+            client = await websockets.connect(f"ws://127.0.0.1:{server.ctx.port}")
+            room_info = json.loads(await client.recv())
+            self.assertEqual(room_info[0]["cmd"], "RoomInfo")
+            await client.close()
+        finally:
+            server.close()
+
+    async def test_front_exits(self) -> None:
+        """Tests that starting the server fails when a front exits before it is serving"""
+        with socket.socket() as taken_socket:
+            # bound without SO_REUSEPORT, so the front can't bind the port
+            taken_socket.bind(("127.0.0.1", 0))
+            taken_socket.listen()
+            server = ShardedServer(self.get_context(taken_socket.getsockname()[1]), 1, None, None, "warning")
+            with self.assertRaises(RuntimeError):
+                await server
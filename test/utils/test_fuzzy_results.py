@@ -0,0 +1,58 @@
+# Tests for get_fuzzy_results and FuzzyNameIndex in Utils.py
+
+import random
+import typing
+import unittest
+
+import jellyfish
+
+from Utils import FuzzyNameIndex, get_fuzzy_results
+
+
+def get_all_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit: typing.Optional[int] = None) \
+        -> typing.List[typing.Tuple[str, int]]:
+    """Computes the ratio of every word, the way get_fuzzy_results worked before the index"""
+    def get_fuzzy_ratio(word1: str, word2: str) -> float:
+        if word1 == word2:
+            return 1.01
+        return (1 - jellyfish.damerau_levenshtein_distance(word1.lower(), word2.lower())
+                / max(len(word1), len(word2)))
+
+    limit = limit if limit else len(word_list)
+    ratios = sorted(((word, get_fuzzy_ratio(input_word, word)) for word in word_list),
+                    key=lambda element: element[1], reverse=True)
+    return [(word, int(ratio * 100)) for word, ratio in ratios[:limit]]
+
+
+class TestFuzzyResults(unittest.TestCase):
+    def test_same_as_all_ratios(self) -> None:
+        """Tests that the index finds the same results, in the same order, as computing the ratio of every word"""
+        rng = random.Random(0)
+        # includes characters that lower to multiple characters and combining characters, which can't be bounded
+        characters = "abcAB -1Éİ́"
+        for _ in range(2000):
+            words = ["".join(rng.choices(characters, k=rng.randint(0, 8))) for _ in range(rng.randint(1, 40))]
+            input_word = rng.choice((rng.choice(words), "".join(rng.choices(characters + "z", k=rng.randint(0, 8)))))
+            limit = rng.choice((None, 1, 2, 5))
+            with self.subTest(input_word=input_word, words=words, limit=limit):
+                self.assertEqual(get_fuzzy_results(input_word, words, limit),
+                                 get_all_fuzzy_results(input_word, words, limit))
+
+    def test_skips_distant_names(self) -> None:
+        """Tests that the edit distance is only computed for names that can be among the results"""
+        names = [f"Coin Piece {number}" for number in range(1000)] + ["Sword", "Wooden Sword", "Shield"]
+        index = FuzzyNameIndex(names)
+        calls = 0
+        distance = jellyfish.damerau_levenshtein_distance
+
+        def count_calls(word1: str, word2: str) -> int:
+            nonlocal calls
+            calls += 1
+            return distance(word1, word2)
+
+        jellyfish.damerau_levenshtein_distance = count_calls
+        try:
+            self.assertEqual(index.get_results("sword", 2), [("Sword", 100), ("Wooden Sword", 41)])
+        finally:
+            jellyfish.damerau_levenshtein_distance = distance
+        self.assertLess(calls, len(names) // 10)
@@ -0,0 +1,43 @@
+import unittest
+
+from Utils import GenerationProfiler
+
+
+class Counted:
+    def method(self) -> int:
+        return 1
+
+
+class TestGenerationProfiler(unittest.TestCase):
+    def test_nested_steps(self) -> None:
+        profiler = GenerationProfiler()
+        with profiler.measure("outer"):
+            with profiler.measure("inner", "fill", game="Game"):
+                pass
+        inner, outer = profiler.events
+        self.assertEqual((outer["name"], inner["name"]), ("outer", "inner"))
+        self.assertGreaterEqual(inner["ts"], outer["ts"])
+        self.assertLessEqual(inner["ts"] + inner["dur"], outer["ts"] + outer["dur"])
+        self.assertEqual(inner["args"]["game"], "Game")
+        self.assertIn("cpu", inner["args"])
+        self.assertEqual(list(profiler.get_totals("game")), ["Game"])
+
+    def test_count_calls(self) -> None:
+        original = Counted.method
+        profiler = GenerationProfiler()
+        profiler.count_calls(Counted, "method")
+        self.assertEqual(Counted().method(), 1)
+        Counted().method()
+        profiler.close()
+        Counted().method()
+        self.assertEqual(profiler.counters["Counted.method"], 2)
+        self.assertIs(Counted.method, original)
+
+    def test_disabled(self) -> None:
+        profiler = GenerationProfiler(enabled=False)
+        with profiler.measure("step"):
+            pass
+        profiler.count_calls(Counted, "method")
+        Counted().method()
+        self.assertEqual(profiler.events, [])
+        self.assertEqual(profiler.counters, {})
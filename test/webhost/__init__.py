@@ -26,9 +26,10 @@ class TestBase(unittest.TestCase):
         })
         try:
             cls.app = get_app()
-        except AssertionError as e:
+        except (AssertionError, ValueError) as e:
             # since we only have 1 global app object, this might fail, but luckily all tests use the same config
-            if "register_blueprint" not in e.args[0]:
+            # flask raises a ValueError instead if the app didn't handle a request yet
+            if "register_blueprint" not in e.args[0] and "already registered" not in e.args[0]:
                 raise
             cls.app = raw_app
 
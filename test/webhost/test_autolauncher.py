@@ -0,0 +1,129 @@
+import concurrent.futures
+import json
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from WebHostLib.autolauncher import RoomSchedule
+from . import TestBase
+
+
+def generate_forever(*args, **kwargs) -> None:
+    time.sleep(60)
+
+
+class TestRoomSchedule(unittest.TestCase):
+    def setUp(self) -> None:
+        self.schedule = RoomSchedule()
+        self.now = datetime(2024, 1, 1)
+
+    def make_room(self, inactive_seconds: int, timeout: int = 60) -> SimpleNamespace:
+        return SimpleNamespace(id=uuid4(), last_activity=self.now - timedelta(seconds=inactive_seconds),
+                               timeout=timeout)
+
+    def test_update(self) -> None:
+        """Verify that rooms are only reported when they should be hosted and their deadline changed."""
+        room = self.make_room(30)
+        self.assertTrue(self.schedule.update(room, self.now))
+        self.assertFalse(self.schedule.update(room, self.now), "unchanged rooms shouldn't be started again")
+        self.assertIn(room.id, self.schedule)
+        room.last_activity = self.now
+        self.assertTrue(self.schedule.update(room, self.now))
+        inactive_room = self.make_room(66)
+        self.assertFalse(self.schedule.update(inactive_room, self.now))
+        self.assertNotIn(inactive_room.id, self.schedule)
+        long_room = self.make_room(int(timedelta(days=3, seconds=1).total_seconds()), timeout=10 ** 7)
+        self.assertFalse(self.schedule.update(long_room, self.now), "rooms are hosted for at most 3 days")
+
+    def test_expire(self) -> None:
+        """Verify that rooms are removed after their latest deadline."""
+        room = self.make_room(30)
+        other_room = self.make_room(0)
+        self.schedule.update(room, self.now)
+        self.schedule.update(other_room, self.now)
+        room.last_activity = self.now
+        self.schedule.update(room, self.now)
+        self.schedule.expire(self.now + timedelta(seconds=50))
+        self.assertIn(room.id, self.schedule, "outdated deadlines shouldn't expire a room")
+        self.schedule.expire(self.now + timedelta(seconds=65))
+        self.assertNotIn(room.id, self.schedule)
+        self.assertNotIn(other_room.id, self.schedule)
+        self.assertEqual(self.schedule.queue, [])
+
+
+class TestRoomScheduleRefresh(TestBase):
+    def test_changed_rooms(self) -> None:
+        """Verify that only rooms with activity since the last refresh are selected again."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room, Seed
+
+        schedule = RoomSchedule()
+        with db_session:
+            owner = uuid4()
+            seed = Seed(multidata=b"", owner=owner)
+            now = datetime.utcnow()
+            room = Room(seed=seed, owner=owner, last_activity=now - timedelta(minutes=1))
+            old_room = Room(seed=seed, owner=owner, last_activity=now - timedelta(days=4))
+            room_ids = {changed_room.id for changed_room in schedule.get_changed_rooms(now)}
+            self.assertIn(room.id, room_ids)
+            self.assertNotIn(old_room.id, room_ids)
+            later = now + timedelta(minutes=1)
+            self.assertNotIn(room.id, {changed_room.id for changed_room in schedule.get_changed_rooms(later)})
+            room.last_activity = later
+            self.assertIn(room.id, {changed_room.id for changed_room in schedule.get_changed_rooms(later)})
+            room.delete()
+            old_room.delete()
+            seed.delete()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "generations are only stopped in generators where os.fork is available")
+class TestGeneratorTimeout(TestBase):
+    options = {"Player1.yaml": {}}
+
+    def test_generation_error(self) -> None:
+        """Verify that a generation that exceeds its time is stopped and marked as failed."""
+        from pony.orm import db_session
+        from Utils import restricted_dumps
+        from WebHostLib.autolauncher import _mp_gen_game
+        from WebHostLib.models import Generation, STATE_ERROR, STATE_STARTED
+
+        with db_session:
+            generation = Generation(options=restricted_dumps(self.options), owner=uuid4(), state=STATE_STARTED)
+        with unittest.mock.patch("WebHostLib.generate.ERmain", generate_forever):
+            start = time.monotonic()
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                _mp_gen_game(self.options, sid=generation.id, timeout=0.1)
+            self.assertLess(time.monotonic() - start, 30)
+        with db_session:
+            generation = Generation[generation.id]
+            self.assertEqual(generation.state, STATE_ERROR)
+            self.assertIn("Allowed time for Generation exceeded", json.loads(generation.meta)["error"])
+            generation.delete()
+
+    def test_generation_stopped(self) -> None:
+        """Verify that a generation that timed out doesn't keep running in the background."""
+        from WebHostLib.autolauncher import _mp_gen_game
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            heartbeat = os.path.join(tempdir, "heartbeat")
+
+            def generate_with_heartbeat(*args, **kwargs) -> None:
+                for _ in range(600):
+                    with open(heartbeat, "a") as f:
+                        f.write(".")
+                    time.sleep(0.01)
+
+            with unittest.mock.patch("WebHostLib.generate.ERmain", generate_with_heartbeat):
+                with self.assertRaises(concurrent.futures.TimeoutError):
+                    _mp_gen_game(self.options, timeout=0.5)
+            with open(heartbeat) as f:
+                beats = f.read()
+            self.assertTrue(beats, "the generation should have started")
+            time.sleep(0.2)
+            with open(heartbeat) as f:
+                self.assertEqual(f.read(), beats, "the generation should have been stopped")
@@ -191,3 +191,35 @@ class TestHostFakeRoom(TestBase):
         with db_session:
             commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
             self.assertNotIn("/help", (command.commandtext for command in commands))
+
+    def test_command_poller(self) -> None:
+        """Verify that the command poller hands the commands of hosted rooms to their context, and keeps the others."""
+        import asyncio
+        from types import SimpleNamespace
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import DBCommandPoller
+        from WebHostLib.models import Command, Room
+
+        calls = []
+        main_loop = SimpleNamespace(call_soon_threadsafe=lambda callback, text: calls.append((callback.ctx, text)))
+        ctx = SimpleNamespace(room_id=self.room_id, exit_event=asyncio.Event(), main_loop=main_loop)
+        poller = DBCommandPoller()
+        poller.rooms_per_query = 1
+        poller.thread = True  # type: ignore  # only poll from this test
+        poller.add(ctx)  # type: ignore
+        with db_session:
+            room = Room.get(id=self.room_id)
+            other_room = Room(seed=room.seed, owner=room.owner)
+            other_room_id = other_room.id
+            Command(room=room, commandtext="/help")
+            Command(room=other_room, commandtext="/exit")
+        poller.poll()
+        self.assertEqual(calls, [(ctx, "/help")])
+        with db_session:
+            commands = select(command.commandtext for command in Command)  # type: ignore
+            self.assertEqual(list(commands), ["/exit"])
+            Room.get(id=other_room_id).delete()
+
+        ctx.exit_event.set()
+        poller.poll()
+        self.assertEqual(poller.processors, {})
@@ -103,3 +103,42 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_decoded_data_shared(self) -> None:
+        """Verify that trackers of the same seed share the decoded multidata and data package lookups."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first, second = TrackerData(room), TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first.item_id_to_name["Archipelago"], second.item_id_to_name["Archipelago"])
+            self.assertEqual(first.item_id_to_name["Archipelago"][-1], "Nothing")
+
+    def test_tracker_projection(self) -> None:
+        """Verify that trackers of a seed with a tracker projection read the same data as from the multidata."""
+        from pony.orm import db_session
+        from MultiServer import Context as MultiServerContext
+        from WebHostLib.models import Room, Seed, SeedTrackerProjection
+        from WebHostLib.tracker import TrackerData, load_tracker_projection, make_tracker_projection
+
+        multidata = MultiServerContext.decompress(self.data)
+        projection = load_tracker_projection(make_tracker_projection(multidata))
+        for key in ("seed_name", "slot_info", "datapackage", "locations", "precollected_items"):
+            self.assertEqual(projection[key], multidata[key])
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            from_multidata = TrackerData(room)
+            projected_seed = Seed(multidata=self.data, owner=room.owner)
+            SeedTrackerProjection(seed=projected_seed, data=make_tracker_projection(multidata))
+            projected_room = Room(seed=projected_seed, owner=room.owner)
+            from_projection = TrackerData(projected_room)
+            self.assertIsNot(from_projection._seed_data, from_projection._multidata)
+            self.assertEqual(from_projection.get_room_locations(), from_multidata.get_room_locations())
+            self.assertEqual(from_projection.get_all_slots(), from_multidata.get_all_slots())
+            self.assertEqual(from_projection.get_datapackage(), from_multidata.get_datapackage())
+            projected_room.delete()
+            projected_seed.delete()
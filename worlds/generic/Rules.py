@@ -1,3 +1,4 @@
+import abc
 import collections
 import logging
 import typing
@@ -96,8 +97,228 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
                 logging.warning(f"Unable to exclude location {loc_name} in player {player}'s world.")
 
 
+class Rule(abc.ABC):
+    """
+    Declarative access rule, which can be used anywhere a CollectionRule can.
+    Combining rules with &, |, And or Or, or through add_rule, flattens them into a single level, merging their item
+    checks per player, instead of nesting one closure in the next. As the items a rule checks are known, an Entrance
+    using one only gets rechecked when one of those items is collected.
+    """
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        ...
+
+    def get_item_dependencies(self, player: int, entrance: typing.Optional["BaseClasses.Entrance"] = None) \
+            -> typing.Optional[typing.FrozenSet[str]]:
+        """
+        Names of the items this rule checks, None if it checks anything else or the items of another player.
+        entrance is the Entrance using this rule, if any.
+        """
+        return None
+
+    def __and__(self, other: "Rule") -> "Rule":
+        if not isinstance(other, Rule):
+            return NotImplemented
+        return And(self, other)
+
+    def __or__(self, other: "Rule") -> "Rule":
+        if not isinstance(other, Rule):
+            return NotImplemented
+        return Or(self, other)
+
+
+class _ItemRule(Rule):
+    """Rule checking counts of items of one player."""
+    __slots__ = ("item_counts", "player")
+    item_counts: typing.Dict[str, int]
+    player: int
+
+    def __init__(self, item_counts: typing.Dict[str, int], player: int) -> None:
+        self.item_counts = item_counts
+        self.player = player
+
+    def get_item_dependencies(self, player: int, entrance: typing.Optional["BaseClasses.Entrance"] = None) \
+            -> typing.Optional[typing.FrozenSet[str]]:
+        return frozenset(self.item_counts) if player == self.player else None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.item_counts}, {self.player})"
+
+
+class Has(_ItemRule):
+    """Has count of the item."""
+    __slots__ = ("item", "count")
+
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        super().__init__({item: count}, player)
+        self.item = item
+        self.count = count
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return state.prog_items[self.player][self.item] >= self.count
+
+
+class HasAll(_ItemRule):
+    """Has all of the items, or at least as many of each as given if item counts are passed."""
+    __slots__ = ("items",)
+    items: typing.Optional[typing.Tuple[str, ...]]
+
+    def __init__(self, items: typing.Union[typing.Iterable[str], typing.Mapping[str, int]], player: int) -> None:
+        item_counts = dict(items) if isinstance(items, typing.Mapping) else dict.fromkeys(items, 1)
+        super().__init__(item_counts, player)
+        # checking for at least one of each is faster without counts
+        self.items = tuple(item_counts) if all(count == 1 for count in item_counts.values()) else None
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        if self.items is not None:
+            return state.has_all(self.items, self.player)
+        return state.has_all_counts(self.item_counts, self.player)
+
+
+class HasAny(_ItemRule):
+    """Has any of the items, or at least as many of any one of them as given if item counts are passed."""
+    __slots__ = ("items",)
+    items: typing.Optional[typing.Tuple[str, ...]]
+
+    def __init__(self, items: typing.Union[typing.Iterable[str], typing.Mapping[str, int]], player: int) -> None:
+        item_counts = dict(items) if isinstance(items, typing.Mapping) else dict.fromkeys(items, 1)
+        super().__init__(item_counts, player)
+        self.items = tuple(item_counts) if all(count == 1 for count in item_counts.values()) else None
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        if self.items is not None:
+            return state.has_any(self.items, self.player)
+        return state.has_any_count(self.item_counts, self.player)
+
+
+class Count(_ItemRule):
+    """Has at least count of the items in total."""
+    __slots__ = ("items", "count")
+
+    def __init__(self, items: typing.Iterable[str], count: int, player: int) -> None:
+        self.items = tuple(items)
+        self.count = count
+        super().__init__(dict.fromkeys(self.items, count), player)
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return state.has_from_list(self.items, self.player, self.count)
+
+    def __repr__(self) -> str:
+        return f"Count({self.items}, {self.count}, {self.player})"
+
+
+class CanReachRegion(Rule):
+    """Can reach the region. The region needs to be registered as indirect condition of entrances using this."""
+    __slots__ = ("region", "player")
+
+    def __init__(self, region: str, player: int) -> None:
+        self.region = region
+        self.player = player
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return state.can_reach_region(self.region, self.player)
+
+    def get_item_dependencies(self, player: int, entrance: typing.Optional["BaseClasses.Entrance"] = None) \
+            -> typing.Optional[typing.FrozenSet[str]]:
+        if player != self.player or not entrance or not entrance.parent_region:
+            return None
+        multiworld = entrance.parent_region.multiworld
+        region = multiworld.regions.region_cache[player].get(self.region)
+        # reaching the region rechecks the entrance through its indirect condition, no item has to
+        if region is None or entrance not in multiworld.indirect_connections.get(region, ()):
+            return None
+        return frozenset()
+
+    def __repr__(self) -> str:
+        return f"CanReachRegion({self.region!r}, {self.player})"
+
+
+class _Combined(Rule):
+    __slots__ = ("rules",)
+    rules: typing.Tuple[Rule, ...]
+
+    def get_item_dependencies(self, player: int, entrance: typing.Optional["BaseClasses.Entrance"] = None) \
+            -> typing.Optional[typing.FrozenSet[str]]:
+        dependencies: typing.Set[str] = set()
+        for rule in self.rules:
+            rule_dependencies = rule.get_item_dependencies(player, entrance)
+            if rule_dependencies is None:
+                return None
+            dependencies |= rule_dependencies
+        return frozenset(dependencies)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self.rules}"
+
+
+class And(_Combined):
+    """All of the rules pass. Item checks of the same player get merged into a single HasAll, checked first."""
+    __slots__ = ()
+
+    def __init__(self, *rules: Rule) -> None:
+        item_counts: typing.Dict[int, typing.Dict[str, int]] = {}
+        other_rules: typing.List[Rule] = []
+        for rule in rules:
+            for part in rule.rules if isinstance(rule, And) else (rule,):
+                if isinstance(part, (Has, HasAll)):
+                    player_counts = item_counts.setdefault(part.player, {})
+                    for item, count in part.item_counts.items():
+                        player_counts[item] = max(player_counts.get(item, 0), count)
+                else:
+                    other_rules.append(part)
+        self.rules = (*(HasAll(counts, player) for player, counts in item_counts.items()), *other_rules)
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        for rule in self.rules:
+            if not rule(state):
+                return False
+        return True
+
+
+class Or(_Combined):
+    """Any of the rules passes. Item checks of the same player get merged into a single HasAny, checked first."""
+    __slots__ = ()
+
+    def __init__(self, *rules: Rule) -> None:
+        item_counts: typing.Dict[int, typing.Dict[str, int]] = {}
+        other_rules: typing.List[Rule] = []
+        for rule in rules:
+            for part in rule.rules if isinstance(rule, Or) else (rule,):
+                if isinstance(part, (Has, HasAny)):
+                    player_counts = item_counts.setdefault(part.player, {})
+                    for item, count in part.item_counts.items():
+                        player_counts[item] = min(player_counts.get(item, count), count)
+                else:
+                    other_rules.append(part)
+        self.rules = (*(HasAny(counts, player) for player, counts in item_counts.items()), *other_rules)
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        for rule in self.rules:
+            if rule(state):
+                return True
+        return False
+
+
+def _get_item_dependencies(entrance: "BaseClasses.Entrance") -> typing.Optional[typing.FrozenSet[str]]:
+    """Item dependencies of the entrance's rule, if it is a Rule and its world collects items under their own name."""
+    rule = entrance.access_rule
+    if not isinstance(rule, Rule) or not entrance.parent_region:
+        return None
+    from worlds.AutoWorld import World
+    world = entrance.parent_region.multiworld.worlds.get(entrance.player)
+    # worlds changing collect may count items under other names, which the rule checks instead
+    if world is None or type(world).collect is not World.collect or type(world).collect_item is not World.collect_item:
+        return None
+    return rule.get_item_dependencies(entrance.player, entrance)
+
+
 def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
     spot.access_rule = rule
+    if isinstance(spot, Entrance):
+        # also makes CollectionStates recheck the entrance and rebuild the dependency index of its player
+        spot.set_item_dependencies(_get_item_dependencies(spot))
 
 
 def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
@@ -105,11 +326,15 @@ def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
     # empty rule, replace instead of add
     if old_rule is Location.access_rule or old_rule is Entrance.access_rule:
         spot.access_rule = rule if combine == "and" else old_rule
+    elif isinstance(rule, Rule) and isinstance(old_rule, Rule):
+        spot.access_rule = And(rule, old_rule) if combine == "and" else Or(rule, old_rule)
     else:
         if combine == "and":
             spot.access_rule = lambda state: rule(state) and old_rule(state)
         else:
             spot.access_rule = lambda state: rule(state) or old_rule(state)
+    if isinstance(spot, Entrance):
+        spot.set_item_dependencies(_get_item_dependencies(spot))
 
 
 def forbid_item(location: "BaseClasses.Location", item: str, player: int):